@@ -3,13 +3,253 @@ Create a Dynatrace dashboard for Kubernetes deployment metrics
 """
 import argparse
 import json
-from dynatrace_client import DynatraceClient
+import logging
+from typing import Iterator, List
+from dynatrace_client import Deployment, DynatraceClient
+
+
+TILE_SIZE = 304
+TILES_PER_ROW = 4
+
+# Above this many deployments a combined chart gets too crowded to read,
+# so each deployment gets its own tiles instead
+COMBINED_TILE_LIMIT = 20
+DEPLOYMENT_DIMENSION = "dt.entity.cloud_application"
+
+
+def _make_tile_template(metric: str, axis_name: str) -> dict:
+    """
+    Build a DATA_EXPLORER graph tile template for a single metric
+
+    Args:
+        metric: Dynatrace metric key queried by the tile
+        axis_name: Y-axis display name
+
+    Returns:
+        Tile dictionary with placeholder name, bounds and entity filter
+    """
+    return {
+        "name": "",
+        "tileType": "DATA_EXPLORER",
+        "configured": True,
+        "bounds": {
+            "top": 0,
+            "left": 0,
+            "width": TILE_SIZE,
+            "height": TILE_SIZE
+        },
+        "tileFilter": {},
+        "customName": "",
+        "queries": [
+            {
+                "id": "A",
+                "metric": metric,
+                "spaceAggregation": "AVG",
+                "timeAggregation": "DEFAULT",
+                "splitBy": [],
+                "filterBy": {
+                    "filterOperator": "AND",
+                    "nestedFilters": [],
+                    "criteria": [
+                        {
+                            "value": "",
+                            "evaluator": "IN"
+                        }
+                    ]
+                },
+                "enabled": True
+            }
+        ],
+        "visualConfig": {
+            "type": "GRAPH_CHART",
+            "global": {},
+            "rules": [
+                {
+                    "matcher": "A:",
+                    "properties": {
+                        "color": "DEFAULT"
+                    },
+                    "seriesOverrides": []
+                }
+            ],
+            "axes": {
+                "xAxis": {
+                    "displayName": "",
+                    "visible": True
+                },
+                "yAxes": [
+                    {
+                        "displayName": axis_name,
+                        "visible": True,
+                        "min": "AUTO",
+                        "max": "AUTO",
+                        "position": "LEFT",
+                        "queryIds": ["A"]
+                    }
+                ]
+            }
+        }
+    }
+
+
+# Tile templates are built once. Tiles share the templates' constant parts
+# (visualConfig, tileFilter, ...) and only get fresh name, bounds and entity
+# filter objects; the payload is serialized as-is and never mutated.
+_CPU_TILE_TEMPLATE = _make_tile_template(
+    "builtin:cloud.kubernetes.workload.cpu.usage", "CPU (millicores)"
+)
+_MEM_TILE_TEMPLATE = _make_tile_template(
+    "builtin:cloud.kubernetes.workload.memory.usage", "Memory (bytes)"
+)
+_HEAP_TILE_TEMPLATE = _make_tile_template(
+    "builtin:containers.memory.residentSetBytes", "Memory (bytes)"
+)
+
+# (template, name suffix, custom name suffix) for the tiles of one deployment
+_TILE_KINDS = (
+    # CPU Usage Tile
+    (_CPU_TILE_TEMPLATE, " - CPU", " - CPU Usage"),
+    # Memory Usage Tile
+    (_MEM_TILE_TEMPLATE, " - Memory", " - Memory Usage"),
+)
+# Container memory tile using resident set bytes
+# This shows actual container memory usage (RSS) which includes JVM heap for Java apps
+_HEAP_TILE_KIND = (_HEAP_TILE_TEMPLATE, " - Container Memory (RSS)", " - Container Memory (Resident Set)")
+_TILE_KINDS_WITH_HEAP = _TILE_KINDS + (_HEAP_TILE_KIND,)
+
+# Dashboard metadata shared by all generated dashboards; only the name varies
+_DASHBOARD_METADATA_TEMPLATE = {
+    "shared": True,
+    "owner": "Dynatrace API",
+    "sharingDetails": {
+        "linkShared": True,
+        "published": False
+    },
+    "dashboardFilter": {
+        "timeframe": "-2h"
+    }
+}
+
+
+def _build_tile(
+    template: dict,
+    name: str,
+    custom_name: str,
+    entity_ids: List[str],
+    position: int
+) -> dict:
+    """
+    Create a tile from a template for the given deployments and grid position
+
+    A tile for several deployments runs one query split by deployment
+    instead of one query per deployment tile. Only workload metrics carry
+    the deployment dimension, so container metric templates must be given
+    a single deployment.
+
+    Args:
+        template: One of the module-level tile templates
+        name: Tile name
+        custom_name: Tile title shown in the dashboard
+        entity_ids: Deployment entity IDs used in the tile filter
+        position: Index of the tile in the dashboard, laid out row by row
+
+    Returns:
+        New tile dictionary
+    """
+    row, col = divmod(position, TILES_PER_ROW)
+
+    tile = dict(template)
+    tile["name"] = name
+    tile["customName"] = custom_name
+    tile["bounds"] = {
+        "top": row * TILE_SIZE,
+        "left": col * TILE_SIZE,
+        "width": TILE_SIZE,
+        "height": TILE_SIZE
+    }
+
+    query = dict(
+        template["queries"][0],
+        filterBy={
+            "filterOperator": "AND" if len(entity_ids) == 1 else "OR",
+            "nestedFilters": [],
+            "criteria": [
+                {
+                    "value": entity_id,
+                    "evaluator": "IN"
+                }
+                for entity_id in entity_ids
+            ]
+        }
+    )
+    if len(entity_ids) > 1:
+        query["splitBy"] = [DEPLOYMENT_DIMENSION]
+    tile["queries"] = [query]
+    return tile
+
+
+def _iter_tiles(deployments: List[Deployment], include_heap: bool, combined: bool = False) -> Iterator[dict]:
+    """
+    Generate dashboard tiles in grid order
+
+    Args:
+        deployments: Deployment entities to create tiles for
+        include_heap: Include a container memory (RSS) tile
+        combined: Chart all deployments in one CPU and one memory tile, as long
+            as there are at most COMBINED_TILE_LIMIT of them. Container memory
+            has no deployment dimension and keeps one tile per deployment
+
+    Yields:
+        Tile dictionaries
+    """
+    if combined and len(deployments) <= COMBINED_TILE_LIMIT:
+        print(f"Adding combined tiles for {len(deployments)} deployment(s)")
+        entity_ids = [deployment.entity_id for deployment in deployments]
+
+        for position, (template, name_suffix, custom_name_suffix) in enumerate(_TILE_KINDS):
+            yield _build_tile(
+                template,
+                name="Deployments" + name_suffix,
+                custom_name="Deployments" + custom_name_suffix,
+                entity_ids=entity_ids,
+                position=position
+            )
+
+        if include_heap:
+            template, name_suffix, custom_name_suffix = _HEAP_TILE_KIND
+            for position, (entity_id, deployment_name) in enumerate(deployments, start=len(_TILE_KINDS)):
+                yield _build_tile(
+                    template,
+                    name=deployment_name + name_suffix,
+                    custom_name=deployment_name + custom_name_suffix,
+                    entity_ids=[entity_id],
+                    position=position
+                )
+        return
+
+    # Resolve the heap option once instead of per deployment
+    tile_kinds = _TILE_KINDS_WITH_HEAP if include_heap else _TILE_KINDS
+    position = 0
+
+    for entity_id, deployment_name in deployments:
+        print(f"Adding tiles for: {deployment_name}")
+
+        for template, name_suffix, custom_name_suffix in tile_kinds:
+            yield _build_tile(
+                template,
+                name=deployment_name + name_suffix,
+                custom_name=deployment_name + custom_name_suffix,
+                entity_ids=[entity_id],
+                position=position
+            )
+            position += 1
 
 
 def create_deployment_dashboard(
     cluster_name: str,
     namespace: str,
-    include_heap: bool = False
+    include_heap: bool = False,
+    combined: bool = False
 ):
     """
     Create a Dynatrace dashboard for deployment metrics
@@ -18,13 +258,15 @@ def create_deployment_dashboard(
         cluster_name: Kubernetes cluster name
         namespace: Kubernetes namespace
         include_heap: Include container memory (RSS) tiles showing resident set bytes
+        combined: Show all deployments in one CPU and one memory tile (split by
+            deployment) instead of separate tiles per deployment
     """
     client = DynatraceClient()
 
     print(f"Creating dashboard for cluster '{cluster_name}' namespace '{namespace}'...")
 
     # Get deployments to create tiles for
-    deployments = client.get_deployments(cluster_name, namespace)
+    deployments = [Deployment.from_entity(entity) for entity in client.get_deployments(cluster_name, namespace)]
 
     if not deployments:
         print(f"No deployments found in cluster '{cluster_name}' namespace '{namespace}'")
@@ -35,246 +277,11 @@ def create_deployment_dashboard(
     # Build dashboard configuration
     dashboard_name = f"K8s Deployments - {cluster_name}/{namespace}"
 
-    # Create tiles for each deployment
-    tiles = []
-    tile_row = 0
-    tile_col = 0
-
-    for deployment in deployments:
-        deployment_name = deployment.get('displayName', 'Unknown')
-        entity_id = deployment.get('entityId', '')
-
-        print(f"Adding tiles for: {deployment_name}")
-
-        # CPU Usage Tile
-        cpu_tile = {
-            "name": f"{deployment_name} - CPU",
-            "tileType": "DATA_EXPLORER",
-            "configured": True,
-            "bounds": {
-                "top": tile_row * 304,
-                "left": tile_col * 304,
-                "width": 304,
-                "height": 304
-            },
-            "tileFilter": {},
-            "customName": f"{deployment_name} - CPU Usage",
-            "queries": [
-                {
-                    "id": "A",
-                    "metric": "builtin:cloud.kubernetes.workload.cpu.usage",
-                    "spaceAggregation": "AVG",
-                    "timeAggregation": "DEFAULT",
-                    "splitBy": [],
-                    "filterBy": {
-                        "filterOperator": "AND",
-                        "nestedFilters": [],
-                        "criteria": [
-                            {
-                                "value": entity_id,
-                                "evaluator": "IN"
-                            }
-                        ]
-                    },
-                    "enabled": True
-                }
-            ],
-            "visualConfig": {
-                "type": "GRAPH_CHART",
-                "global": {},
-                "rules": [
-                    {
-                        "matcher": "A:",
-                        "properties": {
-                            "color": "DEFAULT"
-                        },
-                        "seriesOverrides": []
-                    }
-                ],
-                "axes": {
-                    "xAxis": {
-                        "displayName": "",
-                        "visible": True
-                    },
-                    "yAxes": [
-                        {
-                            "displayName": "CPU (millicores)",
-                            "visible": True,
-                            "min": "AUTO",
-                            "max": "AUTO",
-                            "position": "LEFT",
-                            "queryIds": ["A"]
-                        }
-                    ]
-                }
-            }
-        }
-        tiles.append(cpu_tile)
-
-        # Memory Usage Tile
-        tile_col += 1
-        if tile_col >= 4:
-            tile_col = 0
-            tile_row += 1
-
-        memory_tile = {
-            "name": f"{deployment_name} - Memory",
-            "tileType": "DATA_EXPLORER",
-            "configured": True,
-            "bounds": {
-                "top": tile_row * 304,
-                "left": tile_col * 304,
-                "width": 304,
-                "height": 304
-            },
-            "tileFilter": {},
-            "customName": f"{deployment_name} - Memory Usage",
-            "queries": [
-                {
-                    "id": "A",
-                    "metric": "builtin:cloud.kubernetes.workload.memory.usage",
-                    "spaceAggregation": "AVG",
-                    "timeAggregation": "DEFAULT",
-                    "splitBy": [],
-                    "filterBy": {
-                        "filterOperator": "AND",
-                        "nestedFilters": [],
-                        "criteria": [
-                            {
-                                "value": entity_id,
-                                "evaluator": "IN"
-                            }
-                        ]
-                    },
-                    "enabled": True
-                }
-            ],
-            "visualConfig": {
-                "type": "GRAPH_CHART",
-                "global": {},
-                "rules": [
-                    {
-                        "matcher": "A:",
-                        "properties": {
-                            "color": "DEFAULT"
-                        },
-                        "seriesOverrides": []
-                    }
-                ],
-                "axes": {
-                    "xAxis": {
-                        "displayName": "",
-                        "visible": True
-                    },
-                    "yAxes": [
-                        {
-                            "displayName": "Memory (bytes)",
-                            "visible": True,
-                            "min": "AUTO",
-                            "max": "AUTO",
-                            "position": "LEFT",
-                            "queryIds": ["A"]
-                        }
-                    ]
-                }
-            }
-        }
-        tiles.append(memory_tile)
-
-        # Container Memory Tile (if requested)
-        if include_heap:
-            tile_col += 1
-            if tile_col >= 4:
-                tile_col = 0
-                tile_row += 1
-
-            # Container memory tile using resident set bytes
-            # This shows actual container memory usage (RSS) which includes JVM heap for Java apps
-            memory_detail_tile = {
-                "name": f"{deployment_name} - Container Memory (RSS)",
-                "tileType": "DATA_EXPLORER",
-                "configured": True,
-                "bounds": {
-                    "top": tile_row * 304,
-                    "left": tile_col * 304,
-                    "width": 304,
-                    "height": 304
-                },
-                "tileFilter": {},
-                "customName": f"{deployment_name} - Container Memory (Resident Set)",
-                "queries": [
-                    {
-                        "id": "A",
-                        "metric": "builtin:containers.memory.residentSetBytes",
-                        "spaceAggregation": "AVG",
-                        "timeAggregation": "DEFAULT",
-                        "splitBy": [],
-                        "filterBy": {
-                            "filterOperator": "AND",
-                            "nestedFilters": [],
-                            "criteria": [
-                                {
-                                    "value": entity_id,
-                                    "evaluator": "IN"
-                                }
-                            ]
-                        },
-                        "enabled": True
-                    }
-                ],
-                "visualConfig": {
-                    "type": "GRAPH_CHART",
-                    "global": {},
-                    "rules": [
-                        {
-                            "matcher": "A:",
-                            "properties": {
-                                "color": "DEFAULT"
-                            },
-                            "seriesOverrides": []
-                        }
-                    ],
-                    "axes": {
-                        "xAxis": {
-                            "displayName": "",
-                            "visible": True
-                        },
-                        "yAxes": [
-                            {
-                                "displayName": "Memory (bytes)",
-                                "visible": True,
-                                "min": "AUTO",
-                                "max": "AUTO",
-                                "position": "LEFT",
-                                "queryIds": ["A"]
-                            }
-                        ]
-                    }
-                }
-            }
-            tiles.append(memory_detail_tile)
-
-        # Move to next position
-        tile_col += 1
-        if tile_col >= 4:
-            tile_col = 0
-            tile_row += 1
-
     # Create dashboard payload
     dashboard = {
-        "dashboardMetadata": {
-            "name": dashboard_name,
-            "shared": True,
-            "owner": "Dynatrace API",
-            "sharingDetails": {
-                "linkShared": True,
-                "published": False
-            },
-            "dashboardFilter": {
-                "timeframe": "-2h"
-            }
-        },
-        "tiles": tiles
+        "dashboardMetadata": dict(_DASHBOARD_METADATA_TEMPLATE, name=dashboard_name),
+        # Tiles are generated lazily and only materialized for the POST
+        "tiles": list(_iter_tiles(deployments, include_heap, combined))
     }
 
     # Create the dashboard
@@ -311,14 +318,33 @@ def main():
         action='store_true',
         help='Include container memory (RSS) tiles - shows resident set bytes which includes heap for Java apps'
     )
+    parser.add_argument(
+        '--combined-tiles',
+        action='store_true',
+        help=f'Chart all deployments in one CPU and one memory tile instead of separate tiles per deployment '
+             f'(ignored for more than {COMBINED_TILE_LIMIT} deployments)'
+    )
+
+    parser.add_argument(
+        '--verbose',
+        '-v',
+        action='store_true',
+        help='Show debug logging from the Dynatrace client'
+    )
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+
     try:
         create_deployment_dashboard(
             cluster_name=args.cluster,
             namespace=args.namespace,
-            include_heap=args.include_heap
+            include_heap=args.include_heap,
+            combined=args.combined_tiles
         )
     except Exception as e:
         print(f"Error: {e}")
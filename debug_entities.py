@@ -2,8 +2,25 @@
 Debug script to discover available Dynatrace entity types and test API connectivity
 """
 import argparse
-from dynatrace_client import DynatraceClient
+import logging
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
 import requests
+from dynatrace_client import DynatraceClient, disk_cached
+
+ENTITY_TYPES_CACHE_TTL = 300  # seconds
+
+# Matches Kubernetes/cloud related entity type names
+K8S_TYPE_PATTERN = re.compile(r'CLOUD|KUBERNETES|WORKLOAD|K8S')
+
+# Entity selector variants used when probing entity types
+SELECTOR_TYPE = Template('type("$type")')
+SELECTOR_TYPE_CLUSTER = Template('type("$type"),tag("[Kubernetes]cluster:$cluster")')
+SELECTOR_TYPE_CLUSTER_NAMESPACE = Template(
+    'type("$type"),tag("[Kubernetes]cluster:$cluster"),tag("[Kubernetes]namespace:$namespace")'
+)
 
 
 def test_api_connection(client: DynatraceClient):
@@ -18,59 +35,86 @@ def test_api_connection(client: DynatraceClient):
         return None
 
 
-def list_entity_types(client: DynatraceClient):
-    """List all available entity types in the environment"""
+def _cached_entity_types(client: DynatraceClient, ttl: int = ENTITY_TYPES_CACHE_TTL):
+    """Get all entity types, served from a short-lived disk cache when possible (ttl 0 disables it)"""
+    return disk_cached(
+        'entityTypes', (client.base_url,), ttl,
+        lambda: list(client._paginate('/api/v2/entityTypes', 'types'))
+    )
+
+
+def list_entity_types(client: DynatraceClient, cache_ttl: int = ENTITY_TYPES_CACHE_TTL):
+    """
+    List all available entity types in the environment
+
+    Returns the set of entity type names for fast membership checks.
+    """
     print("Fetching available entity types...")
     try:
-        response = client._make_request('/api/v2/entityTypes')
-        entity_types = response.get('types', [])
+        # The API returns type descriptors; only the names are needed here
+        entity_types = {
+            et.get('type', '') if isinstance(et, dict) else et
+            for et in _cached_entity_types(client, ttl=cache_ttl)
+        }
 
         print(f"\nFound {len(entity_types)} entity types:")
         print("=" * 80)
 
+        # Sort once; the filtered subset keeps the sorted order
+        sorted_types = sorted(entity_types)
+
         # Filter for Kubernetes-related types
-        k8s_types = [et for et in entity_types if 'CLOUD' in et or 'KUBERNETES' in et or 'WORKLOAD' in et or 'K8S' in et]
+        k8s_types = [et for et in sorted_types if K8S_TYPE_PATTERN.search(et)]
 
         if k8s_types:
             print("\nKubernetes/Cloud related entity types:")
-            for entity_type in sorted(k8s_types):
+            for entity_type in k8s_types:
                 print(f"  - {entity_type}")
 
         print("\nAll entity types:")
-        for entity_type in sorted(entity_types):
+        for entity_type in sorted_types:
             print(f"  - {entity_type}")
 
         return entity_types
     except Exception as e:
         print(f"Error listing entity types: {e}")
-        return []
+        return set()
 
 
-def test_entity_query(client: DynatraceClient, entity_type: str, cluster: str = None, namespace: str = None):
-    """Test querying a specific entity type"""
-    print(f"\nTesting query for entity type: {entity_type}")
-    print("-" * 80)
+def _query_entity_type(client: DynatraceClient, entity_type: str, cluster: str = None, namespace: str = None):
+    """Fetch a small sample of entities of the given type"""
+    # Build entity selector
+    if cluster and namespace:
+        selector_template = SELECTOR_TYPE_CLUSTER_NAMESPACE
+    elif cluster:
+        selector_template = SELECTOR_TYPE_CLUSTER
+    else:
+        selector_template = SELECTOR_TYPE
+    entity_selector = selector_template.substitute(type=entity_type, cluster=cluster, namespace=namespace)
+
+    params = {
+        'entitySelector': entity_selector,
+        'fields': '+properties,+tags',
+        'pageSize': 10  # Limit results for testing
+    }
 
+    return client._make_request('/api/v2/entities', params=params)
+
+
+def _fetch_entity_type(client: DynatraceClient, entity_type: str, cluster: str = None, namespace: str = None):
+    """Run the sample query for an entity type, returning (response, error) instead of raising API errors"""
     try:
-        # Build entity selector
-        if cluster and namespace:
-            entity_selector = (
-                f'type("{entity_type}"),'
-                f'tag("[Kubernetes]cluster:{cluster}"),'
-                f'tag("[Kubernetes]namespace:{namespace}")'
-            )
-        elif cluster:
-            entity_selector = f'type("{entity_type}"),tag("[Kubernetes]cluster:{cluster}")'
-        else:
-            entity_selector = f'type("{entity_type}")'
+        return _query_entity_type(client, entity_type, cluster, namespace), None
+    except requests.exceptions.RequestException as e:
+        return None, e
 
-        params = {
-            'entitySelector': entity_selector,
-            'fields': '+properties,+tags',
-            'pageSize': 10  # Limit results for testing
-        }
 
-        response = client._make_request('/api/v2/entities', params=params)
+def _report_entity_query(entity_type: str, response, error):
+    """Print the outcome of an entity type query and return the entities it found"""
+    print(f"\nTesting query for entity type: {entity_type}")
+    print("-" * 80)
+
+    if error is None:
         entities = response.get('entities', [])
         total_count = response.get('totalCount', 0)
 
@@ -99,18 +143,48 @@ def test_entity_query(client: DynatraceClient, entity_type: str, cluster: str =
 
         return entities
 
-    except requests.exceptions.HTTPError as e:
-        if hasattr(e, 'response') and e.response.status_code == 404:
-            print(f"✗ Entity type '{entity_type}' not found (404)")
-        elif hasattr(e, 'response') and e.response.status_code == 400:
-            print(f"✗ Bad request (400) - Entity type may not exist or invalid query")
-            print(f"   Response: {e.response.text}")
-        else:
-            print(f"✗ Error querying entity type: {e}")
-        return []
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        return []
+    response = error.response
+    status_code = response.status_code if response is not None else None
+    if status_code == 404:
+        print(f"✗ Entity type '{entity_type}' not found (404)")
+    elif status_code == 400:
+        print(f"✗ Bad request (400) - Entity type may not exist or invalid query")
+        print(f"   Response: {response.text}")
+    elif response is not None:
+        print(f"✗ Error querying entity type: {error}")
+    else:
+        print(f"✗ Error: {error}")
+    return []
+
+
+def test_entity_query(client: DynatraceClient, entity_type: str, cluster: str = None, namespace: str = None):
+    """Test querying a specific entity type"""
+    return _report_entity_query(entity_type, *_fetch_entity_type(client, entity_type, cluster, namespace))
+
+
+def test_entity_queries(client: DynatraceClient, entity_types: list, cluster: str = None, namespace: str = None,
+                        max_workers: int = 8):
+    """
+    Test several entity types at once
+
+    The queries are issued concurrently so the total wait is roughly one
+    round trip; results are still reported in the order given.
+    """
+    if not entity_types:
+        return {}
+
+    max_workers = max(1, max_workers)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(entity_types))) as executor:
+        pending = {
+            entity_type: executor.submit(_fetch_entity_type, client, entity_type, cluster, namespace)
+            for entity_type in entity_types
+        }
+
+        return {
+            entity_type: _report_entity_query(entity_type, *future.result())
+            for entity_type, future in pending.items()
+        }
 
 
 def show_all_cloud_applications(client: DynatraceClient):
@@ -126,44 +200,52 @@ def show_all_cloud_applications(client: DynatraceClient):
             'pageSize': 50
         }
 
-        response = client._make_request('/api/v2/entities', params=params)
-        entities = response.get('entities', [])
-        total_count = response.get('totalCount', 0)
-
-        print(f"Found {total_count} CLOUD_APPLICATION entities (showing first {len(entities)})")
-
-        if not entities:
-            print("No CLOUD_APPLICATION entities found!")
-            return
-
         # Collect all unique tag keys and some sample values
         all_tag_keys = set()
         cluster_tags = set()
         namespace_tags = set()
-
-        for entity in entities:
+        entity_count = 0
+        add_tag_key = all_tag_keys.add
+        add_cluster_tag = cluster_tags.add
+        add_namespace_tag = namespace_tags.add
+
+        # Entities are printed page by page as they stream in
+        for entity in client._paginate('/api/v2/entities', 'entities', params=params):
+            entity_count += 1
             name = entity.get('displayName', 'N/A')
             tags = entity.get('tags', [])
 
-            print(f"\n{'='*80}")
-            print(f"Entity: {name}")
-            print(f"Entity ID: {entity.get('entityId', 'N/A')}")
-            print(f"Tags:")
+            # Emit each entity block with a single write instead of one print per line
+            lines = [
+                f"\n{'='*80}",
+                f"Entity: {name}",
+                f"Entity ID: {entity.get('entityId', 'N/A')}",
+                "Tags:"
+            ]
 
             for tag in tags:
                 tag_key = tag.get('key', 'N/A')
                 tag_value = tag.get('value', tag.get('stringRepresentation', 'N/A'))
-                all_tag_keys.add(tag_key)
+                add_tag_key(tag_key)
 
-                print(f"  - {tag_key}: {tag_value}")
+                lines.append(f"  - {tag_key}: {tag_value}")
 
                 # Collect cluster and namespace tags
-                if 'cluster' in tag_key.lower():
-                    cluster_tags.add(f"{tag_key}={tag_value}")
-                if 'namespace' in tag_key.lower():
-                    namespace_tags.add(f"{tag_key}={tag_value}")
+                tag_key_folded = tag_key.casefold()
+                if 'cluster' in tag_key_folded:
+                    add_cluster_tag(f"{tag_key}={tag_value}")
+                if 'namespace' in tag_key_folded:
+                    add_namespace_tag(f"{tag_key}={tag_value}")
+
+            lines.append('')
+            sys.stdout.write('\n'.join(lines))
+
+        if not entity_count:
+            print("No CLOUD_APPLICATION entities found!")
+            return
 
         print(f"\n{'='*80}")
+        print(f"Found {entity_count} CLOUD_APPLICATION entities")
         print("SUMMARY - All unique tag keys found:")
         print("=" * 80)
         for key in sorted(all_tag_keys):
@@ -204,9 +286,32 @@ def main():
         action='store_true',
         help='Show all CLOUD_APPLICATION entities and their tags'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Always fetch entity types from the API instead of the {ENTITY_TYPES_CACHE_TTL}s disk cache'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Maximum number of entity type queries to run concurrently (default: 8)'
+    )
+
+    parser.add_argument(
+        '--verbose',
+        '-v',
+        action='store_true',
+        help='Show debug logging from the Dynatrace client'
+    )
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+
     print("=" * 80)
     print("Dynatrace API Debug Tool")
     print("=" * 80)
@@ -231,7 +336,7 @@ def main():
         return 0
 
     # List entity types
-    entity_types = list_entity_types(client)
+    entity_types = list_entity_types(client, cache_ttl=0 if args.no_cache else ENTITY_TYPES_CACHE_TTL)
 
     # Test specific entity type if provided
     if args.test_entity_type:
@@ -251,9 +356,13 @@ def main():
             'KUBERNETES_NODE'
         ]
 
-        for entity_type in common_types:
-            if entity_type in entity_types:
-                test_entity_query(client, entity_type, args.cluster, args.namespace)
+        test_entity_queries(
+            client,
+            [entity_type for entity_type in common_types if entity_type in entity_types],
+            args.cluster,
+            args.namespace,
+            max_workers=args.workers
+        )
 
     print("\n" + "=" * 80)
     print("Debug complete!")
@@ -1,26 +1,357 @@
 """
 Dynatrace API Client for Kubernetes monitoring
 """
+import asyncio
+import hashlib
+import logging
+import math
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import is_not
+from pathlib import Path
 import requests
-from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import json
 
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Read .env once at import rather than on every client construction.
+# Set DYNATRACE_AUTOLOAD_DOTENV=0 to opt out; call load_dotenv(override=True)
+# yourself to pick up later edits to the file.
+if os.getenv('DYNATRACE_AUTOLOAD_DOTENV', '1') == '1':
+    load_dotenv()
+
+# With DEBUG logging enabled, set DYNATRACE_DEBUG_DUMP=1 to write the matched
+# deployment entities of each get_deployments call to debug_deployments.json.
+# Both are checked on every call
+DEBUG_DUMP_ENV_VAR = 'DYNATRACE_DEBUG_DUMP'
+
+# Entity lookups change on the minute scale; metric windows rarely change at all
+ENTITY_CACHE_TTL = 60  # seconds
+METRICS_CACHE_TTL = 300  # seconds
+# Identical dashboard configs created within this window reuse the first dashboard
+DASHBOARD_CACHE_TTL = 3600  # seconds
+# How long an ETag is kept for revalidating a GET once the TTL caches expire
+ETAG_CACHE_TTL = 3600  # seconds
+# Only entity listings are revalidated; metric responses are large and their
+# windows move, so keeping their bodies around would rarely pay off
+ETAG_CACHED_ENDPOINTS = ('/api/v2/entities', '/api/v2/entityTypes')
+
+# Where the scripts keep lookups that may be reused across runs (see disk_cached)
+DISK_CACHE_DIR = Path.home() / '.cache' / 'dynatrace'
+
+_MISSING = object()
+
+# Stop calling the API for BREAKER_COOLDOWN seconds after BREAKER_FAILURE_THRESHOLD
+# timeouts/5xx responses within BREAKER_FAILURE_WINDOW seconds
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_FAILURE_WINDOW = 30  # seconds
+BREAKER_COOLDOWN = 30  # seconds
+
+# Per-pod metrics (CONTAINER_GROUP_INSTANCE)
+CPU_METRIC_KEY = 'builtin:containers.cpu.usageMilliCores'
+MEMORY_METRIC_KEY = 'builtin:containers.memory.residentSetBytes'
+
+# GET endpoints called often enough to keep a prepared request template for
+HOT_GET_ENDPOINTS = ('/api/v2/entities', '/api/v2/metrics/query')
+
+# Only min/max over the whole window are needed, so let Dynatrace fold each
+# series into a single datapoint instead of returning one per hour
+METRIC_STATS_RESOLUTION = 'Inf'
+
+# Dimension identifying the pod of a container metric series
+POD_DIMENSION = 'dt.entity.container_group_instance'
+
+# Maximum number of entities combined into one entityId(...) selector
+METRIC_QUERY_BATCH_SIZE = 100
+
+# Entity properties the deployment filter in get_deployments reads
+DEPLOYMENT_PROPERTY_FIELDS = '+properties.cloudApplicationDeploymentTypes,+properties.namespaceName'
+
+# Query for listing deployments. Since Dynatrace cluster tags may carry prefixes
+# like "AKS Cluster: aks-nexus-deva", the selector only narrows by type and the
+# rest is filtered client-side. Built once; requests never mutates params.
+DEPLOYMENTS_QUERY_PARAMS = {
+    # 'entitySelector': 'type("CLOUD_APPLICATION") AND tag("AKS Cluster:{cluster_name}")',
+    'entitySelector': 'type("CLOUD_APPLICATION")',
+    # Tags are kept for the cluster diagnostics in get_deployments
+    'fields': f'{DEPLOYMENT_PROPERTY_FIELDS},+tags',
+    'pageSize': 1000
+}
+
+# Narrows the listing to applications whose namespace name contains the
+# requested one (case-insensitive), mirroring the client-side match
+NAMESPACE_DEPLOYMENTS_SELECTOR = (
+    'type("CLOUD_APPLICATION"),'
+    'toRelationships.isNamespaceOfCa(type("CLOUD_APPLICATION_NAMESPACE"),entityName.contains("{namespace}"))'
+)
+
+
+def _non_null(values: List[Optional[float]]) -> Iterator[float]:
+    """Iterate over metric data points, skipping gaps (None) without a Python-level loop"""
+    return filter(partial(is_not, None), values)
+
+
+def _decode_json(content: bytes):
+    """Decode a raw JSON response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def encode_json(data, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Encode data as UTF-8 JSON, using orjson when available"""
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, sort_keys=sort_keys).encode('utf-8')
+
+
+def disk_cached(name: str, key_parts: Tuple[str, ...], ttl: float, fetch: Callable[[], Any]) -> Any:
+    """
+    Return fetch(), served from a short-lived JSON file under DISK_CACHE_DIR when possible
+
+    The cache file is named after name and a hash of key_parts (include the
+    environment URL so different tenants never share entries). A ttl of 0 always
+    fetches and writes nothing. Empty results are not cached, and serving a cached
+    result is logged with its age.
+
+    Args:
+        name: Kind of data cached, used in the file name and log messages
+        key_parts: Values identifying the lookup
+        ttl: Seconds a cached result is reused
+        fetch: Called to get the data on a cache miss; must return JSON-serializable data
+
+    Returns:
+        The cached or freshly fetched data
+    """
+    lookup_key = hashlib.sha1('\0'.join(key_parts).encode('utf-8')).hexdigest()[:16]
+    cache_file = DISK_CACHE_DIR / f'{name}-{lookup_key}.json'
+
+    if ttl > 0:
+        try:
+            age = time.time() - cache_file.stat().st_mtime
+            if age < ttl:
+                with open(cache_file) as f:
+                    cached = json.load(f)
+                logger.info("Using %s cached %.0fs ago in %s", name, age, cache_file)
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    data = fetch()
+    if ttl <= 0 or not data:
+        return data
+
+    tmp_path = None
+    try:
+        DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=DISK_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encode_json(data))
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        logger.warning("Could not write %s cache: %s", name, e)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return data
+
+
+def _selector_value(value: str) -> str:
+    """Escape a value for use inside a quoted entity selector string"""
+    return value.replace('~', '~~').replace('"', '~"')
+
+
+@lru_cache(maxsize=4096)
+def _entity_id_selector(entity_id: str) -> str:
+    """Entity selector for a single entity, built once per ID"""
+    return f'entityId("{entity_id}")'
+
+
+def _entity_ids_selector(entity_ids: List[str]) -> str:
+    """Entity selector matching several entities, built in a single join"""
+    return 'entityId("' + '","'.join(entity_ids) + '")'
+
+
+@lru_cache(maxsize=4096)
+def _pods_selector(deployment_entity_id: str) -> str:
+    """Entity selector for the pods (CONTAINER_GROUP_INSTANCE) of a deployment, built once per ID"""
+    return (
+        'type("CONTAINER_GROUP_INSTANCE"),'
+        'fromRelationships.isCgiOfCai(type("CLOUD_APPLICATION_INSTANCE"),'
+        f'fromRelationships.isInstanceOf({_entity_id_selector(deployment_entity_id)}))'
+    )
+
+
+def _default_time_window(
+    time_from: Optional[Union[str, datetime]],
+    time_to: Optional[Union[str, datetime]]
+) -> Tuple[str, str]:
+    """Fill in the default metrics window (last 24 hours) for any missing bound"""
+    if not time_from or not time_to:
+        # Read the clock once so both defaults describe the same window, and
+        # round to the minute so repeat calls share cache keys on both sides
+        now = datetime.now().replace(second=0, microsecond=0)
+        if not time_from:
+            time_from = now - timedelta(hours=24)
+        if not time_to:
+            time_to = now
+    if isinstance(time_from, datetime):
+        time_from = time_from.strftime('%Y-%m-%dT%H:%M:%S')
+    if isinstance(time_to, datetime):
+        time_to = time_to.strftime('%Y-%m-%dT%H:%M:%S')
+    return time_from, time_to
+
+
+@lru_cache(maxsize=64)
+def _min_max_selector(metric_keys: Tuple[str, ...], split_by: Optional[str] = None) -> str:
+    """metricSelector asking for min and max of each metric, built once per key set"""
+    split = f':splitBy("{split_by}")' if split_by else ''
+    return ','.join(f'{key}{split}:min,{key}{split}:max' for key in metric_keys)
+
+
+def _parse_metric_id(metric_id: str) -> Tuple[str, str]:
+    """Split an echoed metricId such as '<key>:splitBy("dim"):min' into (key, aggregation)"""
+    base, _, aggregation = metric_id.rpartition(':')
+    return base.partition(':splitBy(')[0], aggregation
+
+
+class _TTLCache:
+    """Small thread-safe in-process cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl: float, maxsize: int = 512):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=_MISSING):
+        """Like get, but leaves the hit/miss counters alone; for internal probes"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return default
+            return entry[1]
+
+    def __contains__(self, key) -> bool:
+        return self.peek(key) is not _MISSING
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.maxsize and key not in self._entries:
+                # Evict the entry closest to expiry
+                del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _CircuitBreaker:
+    """Fails fast once the API has repeatedly timed out or returned server errors"""
+
+    def __init__(self, threshold: int, window: float, cooldown: float):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures: List[float] = []
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            self._failures = [t for t in self._failures if now - t < self.window]
+            self._failures.append(now)
+            if len(self._failures) >= self.threshold:
+                self._open_until = now + self.cooldown
+                self._failures.clear()
+
+    def record_success(self):
+        with self._lock:
+            self._failures.clear()
+
+
+class MetricStats(NamedTuple):
+    """Min/max of a metric over a time window (tuple-backed, no per-instance dict)"""
+    min: float
+    max: float
+
+
+class Deployment(NamedTuple):
+    """Lightweight view of a deployment entity (tuple-backed, no per-instance dict)"""
+    entity_id: str
+    display_name: str
+
+    @classmethod
+    def from_entity(cls, entity: Dict) -> 'Deployment':
+        """Build from a CLOUD_APPLICATION entity as returned by the entities API"""
+        return cls(entity.get('entityId', ''), entity.get('displayName', 'Unknown'))
+
+
 class DynatraceClient:
     """Client for interacting with Dynatrace API"""
 
-    def __init__(self, base_url: Optional[str] = None, api_token: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_token: Optional[str] = None,
+        max_workers: int = 16,
+        prewarm: bool = False
+    ):
         """
         Initialize Dynatrace client
 
         Args:
             base_url: Dynatrace environment URL (e.g., https://abc12345.live.dynatrace.com)
             api_token: API token with required permissions
+            max_workers: Maximum number of metric queries issued concurrently
+            prewarm: Open a pooled connection (DNS + TLS) in the background right away,
+                so the first real request doesn't pay for the handshake
         """
-        load_dotenv()
-
         self.base_url = (base_url or os.getenv('DYNATRACE_URL', '')).rstrip('/')
         self.api_token = api_token or os.getenv('DYNATRACE_API_TOKEN', '')
 
@@ -32,6 +363,111 @@ class DynatraceClient:
             'Content-Type': 'application/json'
         }
 
+        # Pooled session so TCP/TLS connections are reused across API calls
+        self._session = requests.Session()
+        # Content-Type only describes request bodies, so it is sent with POSTs only
+        self._session.headers['Authorization'] = self.headers['Authorization']
+        # Ask for compressed responses using every codec urllib3 can decode here
+        # (gzip/deflate always; br or zstd when brotli/zstandard are installed).
+        # Entity listings with tags and properties shrink several-fold.
+        self._session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+            'Connection': 'keep-alive'
+        })
+        # Transient 429/5xx responses are retried with exponential backoff, waiting
+        # as long as Retry-After asks on rate limits. urllib3 only retries
+        # idempotent methods on status codes, so dashboard POSTs are never repeated.
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=4,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        # Prepared once per hot endpoint (session headers merged, environment
+        # proxy/TLS settings resolved) so each call only rebuilds its query string
+        self._prepared_gets = {}
+        for endpoint in HOT_GET_ENDPOINTS:
+            url = f"{self.base_url}{endpoint}"
+            prepared = self._session.prepare_request(requests.Request('GET', url))
+            settings = self._session.merge_environment_settings(url, {}, None, None, None)
+            self._prepared_gets[endpoint] = (prepared, settings)
+
+        # Metric queries are network-bound, so overlap them on a thread pool
+        # sized to stay within the session's connection pool
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, 20)))
+
+        self._deployments_cache = _TTLCache(ENTITY_CACHE_TTL)
+        self._pods_cache = _TTLCache(ENTITY_CACHE_TTL)
+        self._workload_metrics_cache = _TTLCache(METRICS_CACHE_TTL)
+        # Separate from the metric pool so pagination never waits on a worker
+        # that may itself be waiting on a page
+        self._page_executor = ThreadPoolExecutor(max_workers=4)
+
+        self._breaker = _CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_FAILURE_WINDOW, BREAKER_COOLDOWN)
+        # Content hash of a dashboard config -> ID of the dashboard created from it
+        self._dashboard_cache = _TTLCache(DASHBOARD_CACHE_TTL, maxsize=128)
+        # (endpoint, params) -> (etag, raw body) for conditional GETs. The body is
+        # decoded again on each 304 so callers never share a mutable response
+        self._etag_cache = _TTLCache(ETAG_CACHE_TTL)
+
+        if prewarm:
+            self._page_executor.submit(self._prewarm_connection)
+
+    def _prewarm_connection(self):
+        """Establish a keep-alive connection to the environment; failures are ignored"""
+        try:
+            self._session.head(self.base_url, timeout=5)
+        except requests.exceptions.RequestException as e:
+            logger.debug("Connection prewarm failed: %s", e)
+
+    def invalidate_entities(self):
+        """Drop cached deployment and pod lookups, e.g. after a rollout changed the topology"""
+        self._deployments_cache.clear()
+        self._pods_cache.clear()
+
+    def clear_cache(self):
+        """Drop all cached lookups: deployments, pods, metrics, created dashboards and ETags"""
+        self._deployments_cache.clear()
+        self._pods_cache.clear()
+        self._workload_metrics_cache.clear()
+        self._dashboard_cache.clear()
+        self._etag_cache.clear()
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and current size of each in-process cache"""
+        caches = {
+            'deployments': self._deployments_cache,
+            'pods': self._pods_cache,
+            'workload_metrics': self._workload_metrics_cache,
+            'dashboards': self._dashboard_cache,
+            'etags': self._etag_cache
+        }
+        return {
+            name: {'hits': cache.hits, 'misses': cache.misses, 'size': len(cache)}
+            for name, cache in caches.items()
+        }
+
+    def close(self):
+        """Close the underlying HTTP session and its pooled connections"""
+        self._executor.shutdown(wait=True)
+        self._page_executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self) -> 'DynatraceClient':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
         Make API request to Dynatrace
@@ -44,20 +480,58 @@ class DynatraceClient:
             JSON response as dictionary
         """
         url = f"{self.base_url}{endpoint}"
+        # Follow-up pages are addressed by a one-off nextPageKey, never worth keeping
+        etag_key = None
+        if endpoint in ETAG_CACHED_ENDPOINTS and not (params and 'nextPageKey' in params):
+            etag_key = (endpoint, tuple(sorted(params.items())) if params else ())
+        validator = self._etag_cache.peek(etag_key, None) if etag_key else None
+        # Revalidate with the stored ETag so an unchanged resource comes back as
+        # an empty 304 instead of a full body to download and decode
+        headers = {'If-None-Match': validator[0]} if validator else None
+
+        if self._breaker.is_open():
+            # Recent calls kept timing out or failing server-side; don't spend
+            # another full timeout (plus retries) finding that out again
+            raise requests.exceptions.ConnectionError(
+                f"Skipping request to {url}: Dynatrace API is failing, retrying after cooldown"
+            )
 
         try:
-            print(f"DEBUG: Making request to: {url}")
+            logger.debug("Making request to: %s", url)
             if params:
-                print(f"DEBUG: Parameters: {params}")
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            print(f"DEBUG: Response status code: {response.status_code}")
+                logger.debug("Parameters: %s", params)
+            template = self._prepared_gets.get(endpoint)
+            if template:
+                prepared, settings = template
+                request = prepared.copy()
+                request.prepare_url(url, params)
+                if headers:
+                    request.headers.update(headers)
+                response = self._session.send(request, timeout=30, **settings)
+            else:
+                response = self._session.get(url, params=params, headers=headers, timeout=30)
+            logger.debug("Response status code: %s", response.status_code)
+            if response.status_code >= 500:
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+            if response.status_code == 304 and validator:
+                return _decode_json(validator[1])
             response.raise_for_status()
-            return response.json()
+            content = response.content
+            etag = response.headers.get('ETag') if etag_key else None
+            if etag:
+                self._etag_cache.set(etag_key, (etag, content))
+            return _decode_json(content)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            self._breaker.record_failure()
+            logger.error("Error making request to %s: %s", url, e)
+            raise
         except requests.exceptions.RequestException as e:
-            print(f"Error making request to {url}: {e}")
+            logger.error("Error making request to %s: %s", url, e)
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response status code: {e.response.status_code}")
-                print(f"Response body: {e.response.text}")
+                logger.error("Response status code: %s", e.response.status_code)
+                logger.error("Response body: %s", e.response.text)
             raise
 
     def _make_post_request(self, endpoint: str, data: Dict) -> Dict:
@@ -74,100 +548,210 @@ class DynatraceClient:
         url = f"{self.base_url}{endpoint}"
 
         try:
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            body = encode_json(data)
+            response = self._session.post(
+                url, data=body, headers={'Content-Type': self.headers['Content-Type']}, timeout=30
+            )
             response.raise_for_status()
-            return response.json()
+            return _decode_json(response.content)
         except requests.exceptions.RequestException as e:
-            print(f"Error making POST request to {url}: {e}")
+            logger.error("Error making POST request to %s: %s", url, e)
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
+                logger.error("Response: %s", e.response.text)
             raise
 
-    def get_deployments(self, cluster_name: str, namespace: str) -> List[Dict]:
+    def _paginate(self, endpoint: str, items_key: str, params: Optional[Dict] = None) -> Iterator[Dict]:
         """
-        Get all deployments in a specific cluster and namespace
+        Iterate over all items of a paginated API listing
+
+        Follows `nextPageKey` until the last page and yields items as each
+        page arrives. The next page is requested in the background while the
+        caller consumes the current one, so at most two pages are held at once.
 
         Args:
-            cluster_name: Kubernetes cluster name (e.g., "aks-nexus-deva")
-            namespace: Kubernetes namespace
+            endpoint: API endpoint path
+            items_key: Response key holding the page items (e.g. 'entities', 'types')
+            params: Query parameters for the first page
 
-        Returns:
-            List of deployment entities
+        Yields:
+            Individual items from every page
         """
-        # Since Dynatrace tags may have prefixes like "AKS Cluster: aks-nexus-deva",
-        # we'll fetch all CLOUD_APPLICATION entities and filter manually
-        print(f"DEBUG: Searching for deployments in cluster '{cluster_name}', namespace '{namespace}'")
+        response = self._make_request(endpoint, params=params)
 
-        try:
-            params = {
-                # 'entitySelector': f'type("CLOUD_APPLICATION") AND tag("AKS Cluster:{cluster_name}")',
-                'entitySelector': f'type("CLOUD_APPLICATION")',
-                'fields': '+properties,+tags',
-                'pageSize': 1000
-            }
+        while True:
+            next_page_key = response.get('nextPageKey')
+            # Follow-up pages must carry the page key only
+            next_page = next_page_key and self._page_executor.submit(
+                self._make_request, endpoint, {'nextPageKey': next_page_key}
+            )
 
-            response = self._make_request('/api/v2/entities', params=params)
-            all_entities = response.get('entities', [])
+            try:
+                yield from response.get(items_key, [])
+            except BaseException:
+                # Consumer stopped early (or raised): drop the prefetch if it hasn't started
+                if next_page:
+                    next_page.cancel()
+                raise
+
+            if not next_page:
+                return
+            response = next_page.result()
+
+    def get_deployments(
+        self,
+        cluster_name: str,
+        namespace: str,
+        force_refresh: bool = False,
+        management_zone: Optional[str] = None,
+        name_filter: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get all deployments in a specific cluster and namespace
 
-            print(f"DEBUG: Retrieved {len(all_entities)} total CLOUD_APPLICATION entities")
+        Without a management zone, applications are looked up by namespace and
+        the broad CLOUD_APPLICATION listing is the fallback. Environments that
+        scope clusters with management zones can pass one so every query is
+        restricted to it server-side (and tags are not fetched). A name filter
+        is likewise applied server-side, so only that deployment is returned.
 
-            if not all_entities:
-                print("WARNING: No CLOUD_APPLICATION entities found in your environment")
-                return []
+        Args:
+            cluster_name: Kubernetes cluster name (e.g., "aks-nexus-deva")
+            namespace: Kubernetes namespace
+            force_refresh: Bypass the cached result from a recent call
+            management_zone: Optional management zone name to restrict the search to
+            name_filter: Optional deployment name to restrict the search to, matched
+                exactly and case-sensitively
 
-            # Filter by namespace and cloudApplicationDeploymentTypes containing KUBERNETES_DEPLOYMENT
-            # (cluster is already filtered by the API selector)
-            matched_entities = []
+        Returns:
+            List of deployment entities
 
-            for entity in all_entities:
-                properties = entity.get('properties', {})
-                deployment_types = properties.get('cloudApplicationDeploymentTypes', [])
-                namespace_name = properties.get('namespaceName', '')
+        Raises:
+            requests.exceptions.RequestException: If the broad listing fails (a failed
+                namespace query falls back to it); nothing is cached then
+        """
+        cache_key = (cluster_name, namespace, management_zone, name_filter)
+        if not force_refresh:
+            cached = self._deployments_cache.get(cache_key)
+            if cached is not _MISSING:
+                return list(cached)
+
+        logger.debug("Searching for deployments in cluster '%s', namespace '%s'", cluster_name, namespace)
+
+        # Ask Dynatrace for the namespace's applications first. Since namespace and
+        # tag naming varies between environments (e.g. "AKS Cluster: aks-nexus-deva"),
+        # fall back to fetching all CLOUD_APPLICATION entities if that finds nothing;
+        # either way the results are filtered manually below
+        narrowed_params = dict(
+            DEPLOYMENTS_QUERY_PARAMS,
+            entitySelector=NAMESPACE_DEPLOYMENTS_SELECTOR.format(namespace=_selector_value(namespace))
+        )
+        broad_params = DEPLOYMENTS_QUERY_PARAMS
+        if management_zone:
+            # The zone already identifies the cluster, so the cluster tags aren't needed
+            zone_scope = f',mzName("{_selector_value(management_zone)}")'
+            narrowed_params = dict(
+                narrowed_params, entitySelector=narrowed_params['entitySelector'] + zone_scope,
+                fields=DEPLOYMENT_PROPERTY_FIELDS
+            )
+            broad_params = dict(
+                broad_params, entitySelector=broad_params['entitySelector'] + zone_scope,
+                fields=DEPLOYMENT_PROPERTY_FIELDS
+            )
+        if name_filter:
+            # entityName.equals alone ignores case; deployment names are matched exactly
+            name_scope = f',caseSensitive(entityName.equals("{_selector_value(name_filter)}"))'
+            narrowed_params = dict(
+                narrowed_params, entitySelector=narrowed_params['entitySelector'] + name_scope
+            )
+            broad_params = dict(
+                broad_params, entitySelector=broad_params['entitySelector'] + name_scope
+            )
 
-                # Check if namespace matches
-                namespace_match = namespace.lower() in namespace_name.lower()
+        # Filter by namespace and cloudApplicationDeploymentTypes containing KUBERNETES_DEPLOYMENT
+        # while the pages stream in, so the full CLOUD_APPLICATION listing is never held at once
+        namespace_folded = namespace.casefold()
+        entity_count = 0
+        matched_entities = []
 
-                # Check if KUBERNETES_DEPLOYMENT is in the deployment types list
-                if namespace_match and 'KUBERNETES_DEPLOYMENT' in deployment_types:
-                    matched_entities.append(entity)
+        for params in (narrowed_params, broad_params):
+            try:
+                for entity in self._paginate('/api/v2/entities', 'entities', params=params):
+                    entity_count += 1
+                    properties = entity.get('properties', {})
+                    # The cheap deployment type check runs first so the namespace
+                    # is only case-folded for actual deployments
+                    if ('KUBERNETES_DEPLOYMENT' in properties.get('cloudApplicationDeploymentTypes', ())
+                            and namespace_folded in properties.get('namespaceName', '').casefold()):
+                        matched_entities.append(entity)
+            except requests.exceptions.RequestException as e:
+                if params is broad_params:
+                    raise
+                # Drop whatever part of the narrowed listing arrived and
+                # fall back to the broad one
+                logger.warning("Namespace deployment lookup failed, trying the full listing: %s", e)
+                entity_count = 0
+                matched_entities = []
+                continue
+            if entity_count:
+                break
+            logger.debug("No entities matched selector %s", params['entitySelector'])
 
-            print(f"DEBUG: Found {len(matched_entities)} KUBERNETES_DEPLOYMENT entities in cluster '{cluster_name}' and namespace '{namespace}'")
+        logger.debug("Retrieved %d total CLOUD_APPLICATION entities", entity_count)
 
-            if matched_entities:
-                # Print sample entity info for debugging
-                sample = matched_entities[0]
-                print(f"DEBUG: Sample entity - Name: {sample.get('displayName', 'N/A')}, ID: {sample.get('entityId', 'N/A')}")
+        if not entity_count:
+            logger.warning("No CLOUD_APPLICATION entities found in your environment")
+            self._deployments_cache.set(cache_key, [])
+            return []
 
-                # Show the cluster tag for verification
-                for tag in sample.get('tags', []):
-                    tag_key = tag.get('key', '')
-                    if 'cluster' in tag_key.lower():
-                        tag_value = tag.get('value', tag.get('stringRepresentation', 'N/A'))
-                        print(f"DEBUG: Cluster tag - {tag_key}: {tag_value}")
-                        break
-            with open('debug_deployments.json', 'w') as f:
-                json.dump(all_entities, f, indent=2)
-            return all_entities
+        logger.debug(
+            "Found %d KUBERNETES_DEPLOYMENT entities in cluster '%s' and namespace '%s'",
+            len(matched_entities), cluster_name, namespace
+        )
+
+        if matched_entities and logger.isEnabledFor(logging.DEBUG):
+            # Log sample entity info for debugging
+            sample = matched_entities[0]
+            logger.debug(
+                "Sample entity - Name: %s, ID: %s",
+                sample.get('displayName', 'N/A'), sample.get('entityId', 'N/A')
+            )
 
-        except Exception as e:
-            print(f"ERROR: Failed to fetch deployments: {e}")
-            return []
+            # Show the cluster tag for verification
+            cluster_tag = next(
+                (tag for tag in sample.get('tags', []) if 'cluster' in tag.get('key', '').casefold()),
+                None
+            )
+            if cluster_tag is not None:
+                logger.debug(
+                    "Cluster tag - %s: %s",
+                    cluster_tag['key'], cluster_tag.get('value', cluster_tag.get('stringRepresentation', 'N/A'))
+                )
+        if logger.isEnabledFor(logging.DEBUG) and os.getenv(DEBUG_DUMP_ENV_VAR, '0') == '1':
+            try:
+                with open('debug_deployments.json', 'wb') as f:
+                    f.write(encode_json(matched_entities, indent=True))
+            except OSError as e:
+                logger.warning("Could not write debug_deployments.json: %s", e)
+        self._deployments_cache.set(cache_key, matched_entities)
+        return list(matched_entities)
 
     def get_workload_metrics(
         self,
         deployment_entity_id: str,
-        time_from: Optional[str] = None,
-        time_to: Optional[str] = None,
-        include_container_memory: bool = True
+        time_from: Optional[Union[str, datetime]] = None,
+        time_to: Optional[Union[str, datetime]] = None,
+        include_container_memory: bool = True,
+        force_refresh: bool = False
     ) -> Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]:
         """
         Get CPU and Memory metrics for a deployment by aggregating pod metrics
 
         Args:
             deployment_entity_id: Dynatrace entity ID for the deployment
-            time_from: Start time (default: 24 hours ago)
-            time_to: End time (default: now)
+            time_from: Start time as a string or datetime (default: 24 hours ago)
+            time_to: End time as a string or datetime (default: now)
             include_container_memory: Whether to include JVM heap memory metrics (default: False)
+            force_refresh: Bypass cached results for the same deployment and time window
 
         Returns:
             Tuple of (cpu_metrics, memory_metrics, container_memory_metrics, pod_count)
@@ -175,269 +759,369 @@ class DynatraceClient:
             memory_metrics: {'min': float, 'max': float} in bytes
             container_memory_metrics: {'min': float, 'max': float} in bytes (None if include_container_memory=False)
             pod_count: number of pods
+
+        Raises:
+            requests.exceptions.RequestException: If listing the pods or querying
+                their metrics fails; failed lookups are not cached
         """
-        if not time_from:
-            time_from = (datetime.now() - timedelta(hours=24)).strftime('%Y-%m-%dT%H:%M:%S')
-        if not time_to:
-            time_to = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        time_from, time_to = _default_time_window(time_from, time_to)
+
+        cache_key = (deployment_entity_id, time_from, time_to, include_container_memory)
+        if not force_refresh:
+            cached = self._workload_metrics_cache.get(cache_key)
+            if cached is not _MISSING:
+                return cached
+
+        result = self._fetch_workload_metrics(
+            deployment_entity_id, time_from, time_to, include_container_memory, force_refresh
+        )
+        self._workload_metrics_cache.set(cache_key, result)
+        return result
 
-        print(f"DEBUG: Getting metrics for deployment {deployment_entity_id}")
+    def get_workload_metrics_batch(
+        self,
+        deployment_entity_ids: List[str],
+        time_from: Optional[Union[str, datetime]] = None,
+        time_to: Optional[Union[str, datetime]] = None,
+        include_container_memory: bool = True,
+        force_refresh: bool = False,
+        max_concurrency: int = 8
+    ) -> List[Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]]:
+        """
+        Get workload metrics for several deployments over one shared time window
+
+        Args:
+            deployment_entity_ids: Dynatrace entity IDs of the deployments
+            time_from: Start time as a string or datetime (default: 24 hours ago)
+            time_to: End time as a string or datetime (default: now)
+            include_container_memory: Whether to include container memory metrics
+            force_refresh: Bypass cached results for the same deployments and time window
+            max_concurrency: Maximum number of deployments measured at once
+
+        Returns:
+            Results of get_workload_metrics, in the order of deployment_entity_ids
+
+        Raises:
+            requests.exceptions.RequestException: If any pod listing or metric query
+                fails; no deployment of the call is cached then
+        """
+        # Resolved once so every deployment is measured over the same interval
+        time_from, time_to = _default_time_window(time_from, time_to)
+
+        results = {}
+        pending = []
+        for entity_id in deployment_entity_ids:
+            if entity_id in results:
+                continue
+            cached = _MISSING
+            if not force_refresh:
+                cached = self._workload_metrics_cache.get(
+                    (entity_id, time_from, time_to, include_container_memory)
+                )
+            results[entity_id] = cached
+            if cached is _MISSING:
+                pending.append(entity_id)
+
+        if pending:
+            if not force_refresh:
+                # List the pods of all deployments up front in a few bulk queries
+                # instead of one query per deployment
+                self._prefetch_pods([
+                    entity_id for entity_id in pending
+                    if entity_id not in self._pods_cache
+                ])
+
+            # Deployments the bulk listing missed are listed on their own, on a
+            # short-lived pool: each waits on the client's pools, so running them
+            # on those could starve them
+            workers = max(1, min(max_concurrency, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pods_by_deployment = list(pool.map(
+                    partial(self._get_pods_for_deployment, force_refresh=force_refresh),
+                    pending
+                ))
+
+            # Query the pods of all deployments together, so the number of metric
+            # queries depends on the total pod count rather than on the number of
+            # deployments
+            pod_ids = list(dict.fromkeys(
+                pod.get('entityId', '') for pods in pods_by_deployment for pod in pods
+            ))
+            stats_by_pod = self._get_pods_workload_stats(pod_ids, time_from, time_to)
+
+            for entity_id, pods in zip(pending, pods_by_deployment):
+                result = self._aggregate_workload_metrics(
+                    entity_id, pods, stats_by_pod, include_container_memory
+                )
+                self._workload_metrics_cache.set(
+                    (entity_id, time_from, time_to, include_container_memory), result
+                )
+                results[entity_id] = result
+
+        return [results[entity_id] for entity_id in deployment_entity_ids]
+
+    def _fetch_workload_metrics(
+        self,
+        deployment_entity_id: str,
+        time_from: str,
+        time_to: str,
+        include_container_memory: bool,
+        force_refresh: bool = False
+    ) -> Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]:
+        """Uncached implementation of get_workload_metrics"""
+        logger.debug("Getting metrics for deployment %s", deployment_entity_id)
 
         # First, get all pods for this deployment
-        pods = self._get_pods_for_deployment(deployment_entity_id)
+        pods = self._get_pods_for_deployment(deployment_entity_id, force_refresh=force_refresh)
+        stats_by_pod = self._get_pods_workload_stats(
+            [pod.get('entityId', '') for pod in pods], time_from, time_to
+        )
+        return self._aggregate_workload_metrics(
+            deployment_entity_id, pods, stats_by_pod, include_container_memory
+        )
+
+    def _get_pods_workload_stats(
+        self,
+        pod_ids: List[str],
+        time_from: str,
+        time_to: str
+    ) -> Dict[str, Dict[str, MetricStats]]:
+        """
+        Get per-pod CPU and memory statistics, one query per batch of pods
+
+        Args:
+            pod_ids: CONTAINER_GROUP_INSTANCE entity IDs
+            time_from: Start time
+            time_to: End time
+
+        Returns:
+            Dictionary mapping each pod ID to its metric key -> MetricStats
+        """
+        # Batches run concurrently on the metric pool
+        batches = [
+            pod_ids[i:i + METRIC_QUERY_BATCH_SIZE]
+            for i in range(0, len(pod_ids), METRIC_QUERY_BATCH_SIZE)
+        ]
+        stats_by_pod = {}
+        batch_stats = self._executor.map(
+            lambda batch: self._get_pods_metrics_stats(
+                batch, [CPU_METRIC_KEY, MEMORY_METRIC_KEY], time_from, time_to
+            ),
+            batches
+        )
+        for stats in batch_stats:
+            stats_by_pod.update(stats)
+        return stats_by_pod
+
+    def _aggregate_workload_metrics(
+        self,
+        deployment_entity_id: str,
+        pods: List[Dict],
+        stats_by_pod: Dict[str, Dict[str, MetricStats]],
+        include_container_memory: bool
+    ) -> Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]:
+        """Combine the per-pod statistics of one deployment into its workload metrics"""
         pod_count = len(pods)
 
-        print(f"DEBUG: Found {pod_count} pods for deployment")
+        logger.debug("Found %d pods for deployment", pod_count)
 
         if pod_count == 0:
-            print("WARNING: No pods found for deployment")
+            logger.warning("No pods found for deployment %s", deployment_entity_id)
             return {'min': 0.0, 'max': 0.0}, {'min': 0.0, 'max': 0.0}, None, 0
 
-        # Aggregate metrics from all pods
-        all_cpu_values = []
-        all_memory_values = []
+        # Aggregate metrics from all pods in a single pass. Pods without data are
+        # skipped; the rest contribute their lowest nonzero min and the sum of
+        # their max values
+        cpu_min, cpu_max_sum = math.inf, 0.0
+        memory_min, memory_max_sum = math.inf, 0.0
+        # Container memory is the same resident set metric at the same resolution,
+        # so take its range across pods from the per-pod results rather than
+        # querying it again
+        container_min, container_max = math.inf, -math.inf
 
         for pod in pods:
-            pod_id = pod.get('entityId', '')
-            pod_name = pod.get('displayName', 'Unknown')
+            pod_stats = stats_by_pod[pod.get('entityId', '')]
+            cpu_metrics = pod_stats[CPU_METRIC_KEY]
+            memory_metrics = pod_stats[MEMORY_METRIC_KEY]
 
-            print(f"DEBUG: Fetching metrics for pod: {pod_name} ({pod_id})")
+            if cpu_metrics.min > 0 or cpu_metrics.max > 0:
+                if 0 < cpu_metrics.min < cpu_min:
+                    cpu_min = cpu_metrics.min
+                cpu_max_sum += cpu_metrics.max
 
-            # Fetch CPU metrics for this pod
-            cpu_metrics = self._get_metric_stats(
-                metric_key='builtin:containers.cpu.usageMilliCores',
-                entity_selector=f'entityId("{pod_id}")',
-                time_from=time_from,
-                time_to=time_to
-            )
+            if memory_metrics.min > 0 or memory_metrics.max > 0:
+                if 0 < memory_metrics.min < memory_min:
+                    memory_min = memory_metrics.min
+                memory_max_sum += memory_metrics.max
+                container_min = min(container_min, memory_metrics.min)
+                container_max = max(container_max, memory_metrics.max)
 
-            # Fetch Memory metrics for this pod
-            memory_metrics = self._get_metric_stats(
-                metric_key='builtin:containers.memory.residentSetBytes',
-                entity_selector=f'entityId("{pod_id}")',
-                time_from=time_from,
-                time_to=time_to
-            )
-
-            if cpu_metrics['min'] > 0 or cpu_metrics['max'] > 0:
-                all_cpu_values.append(cpu_metrics)
-
-            if memory_metrics['min'] > 0 or memory_metrics['max'] > 0:
-                all_memory_values.append(memory_metrics)
-
-        # Aggregate the metrics
-        if all_cpu_values:
-            cpu_mins = [m['min'] for m in all_cpu_values if m['min'] > 0]
-            aggregated_cpu = {
-                'min': min(cpu_mins) if cpu_mins else 0.0,
-                'max': sum(m['max'] for m in all_cpu_values)  # Sum of max across all pods
-            }
-        else:
-            aggregated_cpu = {'min': 0.0, 'max': 0.0}
-
-        if all_memory_values:
-            memory_mins = [m['min'] for m in all_memory_values if m['min'] > 0]
-            aggregated_memory = {
-                'min': min(memory_mins) if memory_mins else 0.0,
-                'max': sum(m['max'] for m in all_memory_values)  # Sum of max across all pods
-            }
-        else:
-            aggregated_memory = {'min': 0.0, 'max': 0.0}
+        aggregated_cpu = {'min': 0.0 if cpu_min == math.inf else cpu_min, 'max': cpu_max_sum}
+        aggregated_memory = {'min': 0.0 if memory_min == math.inf else memory_min, 'max': memory_max_sum}
 
-        # Fetch container memory metrics if requested
         container_memory_metrics = None
         if include_container_memory:
-            container_memory_metrics = self._get_container_memory_metrics(
-                deployment_entity_id=deployment_entity_id,
-                time_from=time_from,
-                time_to=time_to
-            )
+            container_memory_metrics = {
+                'min': 0.0 if container_min == math.inf else container_min,
+                'max': 0.0 if container_max == -math.inf else container_max
+            }
 
-        print(f"DEBUG: Aggregated CPU: {aggregated_cpu}")
-        print(f"DEBUG: Aggregated Memory: {aggregated_memory}")
+        logger.debug("Aggregated CPU: %s", aggregated_cpu)
+        logger.debug("Aggregated Memory: %s", aggregated_memory)
 
         return aggregated_cpu, aggregated_memory, container_memory_metrics, pod_count
 
-    def _get_metric_stats(
+    def _get_pods_metrics_stats(
         self,
-        metric_key: str,
-        entity_selector: str,
+        pod_ids: List[str],
+        metric_keys: List[str],
         time_from: str,
         time_to: str
-    ) -> Dict[str, float]:
+    ) -> Dict[str, Dict[str, MetricStats]]:
         """
-        Get min and max statistics for a metric
+        Get per-pod min and max statistics for several metrics and pods with a single query
 
         Args:
-            metric_key: Dynatrace metric key
-            entity_selector: Entity selector query
+            pod_ids: CONTAINER_GROUP_INSTANCE entity IDs, queried together
+            metric_keys: Dynatrace metric keys
             time_from: Start time
             time_to: End time
 
         Returns:
-            Dictionary with 'min' and 'max' values
+            Dictionary mapping each pod ID to its metric key -> MetricStats;
+            pods without data get zeros
+
+        Raises:
+            requests.exceptions.RequestException: If the query fails
         """
         params = {
-            'metricSelector': f'{metric_key}:min,{metric_key}:max',
-            'entitySelector': entity_selector,
+            # Split explicitly by pod so each pod gets exactly one series per metric,
+            # whatever other dimensions the metric carries
+            'metricSelector': _min_max_selector(tuple(metric_keys), POD_DIMENSION),
+            'entitySelector': f'type("CONTAINER_GROUP_INSTANCE"),{_entity_ids_selector(pod_ids)}',
             'from': time_from,
             'to': time_to,
-            'resolution': '1h'  # 1 hour resolution
+            'resolution': METRIC_STATS_RESOLUTION
         }
 
-        try:
-            print(f"DEBUG: Fetching metric {metric_key}")
-            response = self._make_request('/api/v2/metrics/query', params=params)
-
-            min_val = 0.0
-            max_val = 0.0
-
-            print(f"DEBUG: Metric response: {response}")
-
-            if 'result' in response and len(response['result']) > 0:
-                print(f"DEBUG: Found {len(response['result'])} result items")
-                for result_item in response['result']:
-                    metric_id = result_item.get('metricId', '')
-                    data = result_item.get('data', [])
-
-                    print(f"DEBUG: Metric ID: {metric_id}, Data entries: {len(data)}")
-
-                    if data and len(data) > 0:
-                        values = data[0].get('values', [])
-                        print(f"DEBUG: Values count: {len(values)}, Sample: {values[:3] if len(values) > 0 else 'empty'}")
-                        if values:
-                            if ':min' in metric_id:
-                                min_val = min([v for v in values if v is not None], default=0.0)
-                            elif ':max' in metric_id:
-                                max_val = max([v for v in values if v is not None], default=0.0)
-            else:
-                print(f"WARNING: No results returned for metric {metric_key}")
-                if 'result' in response:
-                    print(f"DEBUG: Empty result array")
-                else:
-                    print(f"DEBUG: No 'result' key in response")
-
-            print(f"DEBUG: Final values for {metric_key} - min: {min_val}, max: {max_val}")
-            return {'min': min_val, 'max': max_val}
-        except Exception as e:
-            print(f"ERROR: Error fetching metric {metric_key}: {e}")
-            import traceback
-            traceback.print_exc()
-            return {'min': 0.0, 'max': 0.0}
+        # (pod ID, metric key) -> value, per aggregation
+        found = {'min': {}, 'max': {}}
+
+        logger.debug("Fetching metrics %s for %d pods", metric_keys, len(pod_ids))
+        response = self._make_request('/api/v2/metrics/query', params=params)
+
+        # One series per pod, identified by its container group instance dimension
+        for result_item in response.get('result', []):
+            metric_key, aggregation = _parse_metric_id(result_item.get('metricId', ''))
+            if metric_key not in metric_keys or aggregation not in found:
+                continue
+            reduce = min if aggregation == 'min' else max
+
+            for series in result_item.get('data', []):
+                pod_id = series.get('dimensionMap', {}).get(POD_DIMENSION)
+                if pod_id is None:
+                    dimensions = series.get('dimensions') or [None]
+                    pod_id = dimensions[0]
+
+                values = series.get('values', [])
+                if values:
+                    found[aggregation][pod_id, metric_key] = reduce(_non_null(values), default=0.0)
+
+        mins, maxes = found['min'], found['max']
+        return {
+            pod_id: {
+                key: MetricStats(mins.get((pod_id, key), 0.0), maxes.get((pod_id, key), 0.0))
+                for key in metric_keys
+            }
+            for pod_id in pod_ids
+        }
 
-    def _get_pods_for_deployment(self, deployment_entity_id: str) -> List[Dict]:
+    def _get_pods_for_deployment(self, deployment_entity_id: str, force_refresh: bool = False) -> List[Dict]:
         """
         Get all pods (CONTAINER_GROUP_INSTANCE) for a deployment
 
         Args:
             deployment_entity_id: Deployment entity ID
+            force_refresh: Bypass the cached result from a recent call
 
         Returns:
             List of container group instance entities (pods)
+
+        Raises:
+            requests.exceptions.RequestException: If the listing fails; nothing is cached
         """
+        if not force_refresh:
+            cached = self._pods_cache.get(deployment_entity_id)
+            if cached is not _MISSING:
+                return list(cached)
+
         # Query for container group instances (pods) belonging to this deployment
         # Using CONTAINER_GROUP_INSTANCE which is the entity type for pod metrics
-        entity_selector = f'type("CONTAINER_GROUP_INSTANCE"),fromRelationships.isCgiOfCai(type("CLOUD_APPLICATION_INSTANCE"),fromRelationships.isInstanceOf(entityId("{deployment_entity_id}")))'
+        entity_selector = _pods_selector(deployment_entity_id)
 
+        # Only entityId and displayName are read, which the API always returns
         params = {
             'entitySelector': entity_selector,
-            'pageSize': 500,
-            'fields': '+properties,+tags'
+            'pageSize': 500
         }
 
-        try:
-            print(f"DEBUG: Fetching container group instances for deployment {deployment_entity_id}")
-            response = self._make_request('/api/v2/entities', params=params)
-            pods = response.get('entities', [])
-            print(f"DEBUG: Found {len(pods)} container group instances")
-            return pods
-        except Exception as e:
-            print(f"ERROR: Error fetching container group instances: {e}")
-            return []
+        logger.debug("Fetching container group instances for deployment %s", deployment_entity_id)
+        pods = list(self._paginate('/api/v2/entities', 'entities', params=params))
+        logger.debug("Found %d container group instances", len(pods))
+        self._pods_cache.set(deployment_entity_id, pods)
+        return list(pods)
 
-    def _get_pod_count(self, deployment_entity_id: str) -> int:
+    def _prefetch_pods(self, deployment_entity_ids: List[str]):
         """
-        Get the number of pods for a deployment
+        Fill the pod cache for many deployments with two listings per batch
 
-        Args:
-            deployment_entity_id: Deployment entity ID
-
-        Returns:
-            Number of pods
-        """
-        pods = self._get_pods_for_deployment(deployment_entity_id)
-        return len(pods)
-
-    def _get_container_memory_metrics(
-        self,
-        deployment_entity_id: str,
-        time_from: str,
-        time_to: str
-    ) -> Dict[str, float]:
-        """
-        Get container memory metrics for a deployment.
-        Since JVM heap metrics are unavailable in typical containerized workloads,
-        this uses resident set bytes from CONTAINER_GROUP_INSTANCE as a substitute.
+        Pods are linked to their deployment through their CLOUD_APPLICATION_INSTANCE,
+        so one listing maps instances to deployments and a second lists the pods of
+        all those instances. Deployments without pods, or whose batch failed, are
+        not cached and fall back to the per-deployment query.
 
         Args:
-            deployment_entity_id: Deployment entity ID
-            time_from: Start time
-            time_to: End time
-
-        Returns:
-            Dictionary with 'min' and 'max' memory values in bytes
+            deployment_entity_ids: Deployment entity IDs
         """
-        # Get container group instances (pods) for this deployment
-        pods = self._get_pods_for_deployment(deployment_entity_id)
-
-        if not pods:
-            print(f"No pods found for deployment {deployment_entity_id}")
-            return {'min': 0.0, 'max': 0.0}
-
-        min_mem = float('inf')
-        max_mem = float('-inf')
+        for i in range(0, len(deployment_entity_ids), METRIC_QUERY_BATCH_SIZE):
+            batch = deployment_entity_ids[i:i + METRIC_QUERY_BATCH_SIZE]
+            instances_selector = (
+                'type("CLOUD_APPLICATION_INSTANCE"),'
+                f'fromRelationships.isInstanceOf({_entity_ids_selector(batch)})'
+            )
 
-        for pod in pods:
-            container_id = pod['entityId']
             try:
-                # Query container memory metrics
-                metric_selector = (
-                    f"builtin:containers.memory.residentSetBytes:min,"
-                    f"builtin:containers.memory.residentSetBytes:max"
-                )
-                entity_selector = f'type("CONTAINER_GROUP_INSTANCE"),entityId("{container_id}")'
-
-                response = self._query_metrics(
-                    metric_selector=metric_selector,
-                    entity_selector=entity_selector,
-                    time_from=time_from,
-                    time_to=time_to,
-                    resolution='1h'
-                )
-
-                # Extract min/max from response
-                for metric in response.get('result', []):
-                    values = metric.get('data', [])[0].get('values', [])
-                    values_filtered = [v for v in values if v is not None]
-                    if not values_filtered:
-                        continue
-
-                    if metric['metricId'].endswith(':min'):
-                        min_mem = min(min_mem, min(values_filtered))
-                    elif metric['metricId'].endswith(':max'):
-                        max_mem = max(max_mem, max(values_filtered))
-
-            except Exception as e:
-                print(f"Error fetching memory for container {container_id}: {e}")
+                deployment_of_instance = {}
+                for instance in self._paginate('/api/v2/entities', 'entities', params={
+                    'entitySelector': instances_selector,
+                    'fields': '+fromRelationships.isInstanceOf',
+                    'pageSize': 500
+                }):
+                    instance_id = instance.get('entityId')
+                    for relation in instance.get('fromRelationships', {}).get('isInstanceOf', []):
+                        if instance_id and relation.get('id'):
+                            deployment_of_instance[instance_id] = relation['id']
+
+                pods_by_deployment = {entity_id: [] for entity_id in batch}
+                for pod in self._paginate('/api/v2/entities', 'entities', params={
+                    'entitySelector': f'type("CONTAINER_GROUP_INSTANCE"),fromRelationships.isCgiOfCai({instances_selector})',
+                    'fields': '+fromRelationships.isCgiOfCai',
+                    'pageSize': 500
+                }):
+                    for relation in pod.get('fromRelationships', {}).get('isCgiOfCai', []):
+                        pods = pods_by_deployment.get(deployment_of_instance.get(relation.get('id')))
+                        if pods is not None:
+                            pods.append(pod)
+                            break
+            except requests.exceptions.RequestException as e:
+                logger.warning("Error prefetching container group instances: %s", e)
                 continue
 
-        if min_mem == float('inf'):
-            min_mem = 0.0
-        if max_mem == float('-inf'):
-            max_mem = 0.0
-
-        return {'min': min_mem, 'max': max_mem}
-
+            # Deployments that came back empty are left to the per-deployment
+            # query, so a relationship the bulk path mis-resolves can't hide pods
+            for entity_id, pods in pods_by_deployment.items():
+                if pods:
+                    self._pods_cache.set(entity_id, pods)
 
     def create_dashboard(self, dashboard_config: Dict) -> Optional[str]:
         """
@@ -449,40 +1133,130 @@ class DynatraceClient:
         Returns:
             Dashboard ID if successful, None otherwise
         """
+        # Resubmitting an identical config (e.g. a rerun script) returns the
+        # dashboard already created instead of posting a duplicate
+        config_hash = hashlib.sha256(encode_json(dashboard_config, sort_keys=True)).hexdigest()
+        cached = self._dashboard_cache.get(config_hash)
+        if cached is not _MISSING:
+            logger.debug("Reusing dashboard %s created from an identical config", cached)
+            return cached
+
         try:
             response = self._make_post_request('/api/config/v1/dashboards', dashboard_config)
             dashboard_id = response.get('id')
+            if dashboard_id:
+                self._dashboard_cache.set(config_hash, dashboard_id)
             return dashboard_id
         except Exception as e:
-            print(f"Error creating dashboard: {e}")
+            logger.exception("Error creating dashboard: %s", e)
             return None
 
-    def _query_metrics(
+
+class AsyncDynatraceClient:
+    """
+    asyncio front end for DynatraceClient, for callers fanning out over many deployments
+
+    Blocking client calls run on a dedicated thread pool and share the wrapped
+    client's pooled session, so `asyncio.gather` over hundreds of deployments
+    keeps at most `max_concurrency` of them in flight.
+    """
+
+    def __init__(
         self,
-        metric_selector: str,
-        entity_selector: str = None,
-        time_from: str = None,
-        time_to: str = None,
-        resolution: str = None
+        base_url: Optional[str] = None,
+        api_token: Optional[str] = None,
+        max_concurrency: int = 8,
+        client: Optional[DynatraceClient] = None
     ):
         """
-        Generic helper to call /api/v2/metrics/query.
-        Works with _make_request() which already returns parsed JSON.
+        Initialize async Dynatrace client
+
+        Args:
+            base_url: Dynatrace environment URL (e.g., https://abc12345.live.dynatrace.com)
+            api_token: API token with required permissions
+            max_concurrency: Maximum number of client calls running at once
+            client: Existing DynatraceClient to wrap instead of creating one;
+                the caller stays responsible for closing it
+        """
+        self._owns_client = client is None
+        self.client = client or DynatraceClient(base_url=base_url, api_token=api_token)
+        # Separate from the client's metric pool: workload calls block on
+        # that pool, so running them on it could starve it
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_deployments(
+        self,
+        cluster_name: str,
+        namespace: str,
+        management_zone: Optional[str] = None,
+        name_filter: Optional[str] = None
+    ) -> List[Dict]:
+        """Async version of DynatraceClient.get_deployments"""
+        return await self._run(
+            self.client.get_deployments, cluster_name, namespace,
+            management_zone=management_zone, name_filter=name_filter
+        )
+
+    async def get_workload_metrics(
+        self,
+        deployment_entity_id: str,
+        time_from: Optional[Union[str, datetime]] = None,
+        time_to: Optional[Union[str, datetime]] = None,
+        include_container_memory: bool = True
+    ) -> Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]:
+        """Async version of DynatraceClient.get_workload_metrics"""
+        return await self._run(
+            self.client.get_workload_metrics,
+            deployment_entity_id=deployment_entity_id,
+            time_from=time_from,
+            time_to=time_to,
+            include_container_memory=include_container_memory
+        )
+
+    async def get_workload_metrics_many(
+        self,
+        deployment_entity_ids: List[str],
+        time_from: Optional[Union[str, datetime]] = None,
+        time_to: Optional[Union[str, datetime]] = None,
+        include_container_memory: bool = True
+    ) -> List[Tuple[Dict[str, float], Dict[str, float], Optional[Dict[str, float]], int]]:
         """
+        Get workload metrics for several deployments concurrently
 
-        params = {"metricSelector": metric_selector}
-
-        if entity_selector:
-            params["entitySelector"] = entity_selector
-        if time_from:
-            params["from"] = time_from
-        if time_to:
-            params["to"] = time_to
-        if resolution:
-            params["resolution"] = resolution
-
-        # _make_request already:
-        # - performs the HTTP call
-        # - calls raise_for_status()
-        # - returns response.json()
-        return self._make_request("/api/v2/metrics/query", params=params)
+        Args:
+            deployment_entity_ids: Dynatrace entity IDs of the deployments
+            time_from: Start time (default: 24 hours ago)
+            time_to: End time (default: now)
+            include_container_memory: Whether to include container memory metrics
+
+        Returns:
+            Results of get_workload_metrics, in the order of deployment_entity_ids
+        """
+        # The batch call shares one time window and prefetches every
+        # deployment's pods in a few bulk queries before fanning out
+        return await self._run(
+            self.client.get_workload_metrics_batch,
+            deployment_entity_ids,
+            time_from=time_from,
+            time_to=time_to,
+            include_container_memory=include_container_memory
+        )
+
+    async def close(self):
+        """Shut down the worker pool, and the wrapped client if this wrapper created it"""
+        loop = asyncio.get_running_loop()
+        # Both wait for in-flight calls to finish, so block a default-pool
+        # thread rather than the event loop
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait=True))
+        if self._owns_client:
+            await loop.run_in_executor(None, self.client.close)
+
+    async def __aenter__(self) -> 'AsyncDynatraceClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -1,9 +1,10 @@
 """
 Example of using the Dynatrace client programmatically
 """
+import asyncio
 import csv
 from datetime import datetime, timedelta
-from dynatrace_client import DynatraceClient
+from dynatrace_client import AsyncDynatraceClient, DynatraceClient
 
 
 def example_basic_usage():
@@ -24,6 +25,8 @@ def example_basic_usage():
     # Set time range (last 24 hours)
     time_to = datetime.now()
     time_from = time_to - timedelta(hours=24)
+    time_from_str = time_from.strftime('%Y-%m-%dT%H:%M:%S')
+    time_to_str = time_to.strftime('%Y-%m-%dT%H:%M:%S')
 
     # Fetch metrics for each deployment
     for deployment in deployments:
@@ -34,10 +37,10 @@ def example_basic_usage():
         print(f"Entity ID: {entity_id}")
 
         # Get metrics
-        cpu_metrics, memory_metrics, pod_count = client.get_workload_metrics(
+        cpu_metrics, memory_metrics, _, pod_count = client.get_workload_metrics(
             deployment_entity_id=entity_id,
-            time_from=time_from.strftime('%Y-%m-%dT%H:%M:%S'),
-            time_to=time_to.strftime('%Y-%m-%dT%H:%M:%S')
+            time_from=time_from_str,
+            time_to=time_to_str
         )
 
         # Display results
@@ -72,6 +75,8 @@ def example_process_data():
 
     time_to = datetime.now()
     time_from = time_to - timedelta(hours=168)  # Last 7 days
+    time_from_str = time_from.strftime('%Y-%m-%dT%H:%M:%S')
+    time_to_str = time_to.strftime('%Y-%m-%dT%H:%M:%S')
 
     total_cpu_max = 0
     total_memory_max = 0
@@ -79,10 +84,10 @@ def example_process_data():
 
     for deployment in deployments:
         entity_id = deployment.get('entityId', '')
-        cpu_metrics, memory_metrics, pod_count = client.get_workload_metrics(
+        cpu_metrics, memory_metrics, _, pod_count = client.get_workload_metrics(
             deployment_entity_id=entity_id,
-            time_from=time_from.strftime('%Y-%m-%dT%H:%M:%S'),
-            time_to=time_to.strftime('%Y-%m-%dT%H:%M:%S')
+            time_from=time_from_str,
+            time_to=time_to_str
         )
 
         total_cpu_max += cpu_metrics['max']
@@ -107,29 +112,31 @@ def example_export_to_csv():
 
     time_to = datetime.now()
     time_from = time_to - timedelta(hours=24)
+    time_from_str = time_from.strftime('%Y-%m-%dT%H:%M:%S')
+    time_to_str = time_to.strftime('%Y-%m-%dT%H:%M:%S')
 
-    # Prepare data for CSV
-    csv_data = []
+    # Prepare rows for CSV, in the same order as the header below
+    csv_rows = []
 
     for deployment in deployments:
         name = deployment.get('displayName', 'Unknown')
         entity_id = deployment.get('entityId', '')
 
-        cpu_metrics, memory_metrics, pod_count = client.get_workload_metrics(
+        cpu_metrics, memory_metrics, _, pod_count = client.get_workload_metrics(
             deployment_entity_id=entity_id,
-            time_from=time_from.strftime('%Y-%m-%dT%H:%M:%S'),
-            time_to=time_to.strftime('%Y-%m-%dT%H:%M:%S')
+            time_from=time_from_str,
+            time_to=time_to_str
         )
 
-        csv_data.append({
-            'cluster': cluster_name,
-            'deployment': name,
-            'cpu_usage_min': cpu_metrics['min'],
-            'cpu_usage_max': cpu_metrics['max'],
-            'memory_usage_min': memory_metrics['min'],
-            'memory_usage_max': memory_metrics['max'],
-            'number_of_pods': pod_count
-        })
+        csv_rows.append((
+            cluster_name,
+            name,
+            cpu_metrics['min'],
+            cpu_metrics['max'],
+            memory_metrics['min'],
+            memory_metrics['max'],
+            pod_count
+        ))
 
     # Write to CSV
     output_file = f'deployment_metrics_{cluster_name}_{namespace}.csv'
@@ -143,13 +150,37 @@ def example_export_to_csv():
             'memory_usage_max',
             'number_of_pods'
         ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(csv_data)
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(csv_rows)
 
     print(f"CSV exported to: {output_file}")
 
 
+def example_async_fan_out():
+    """Example fetching metrics for many deployments concurrently with asyncio"""
+
+    async def fetch_all():
+        async with AsyncDynatraceClient(max_concurrency=8) as client:
+            deployments = await client.get_deployments("my-cluster", "production")
+
+            time_to = datetime.now()
+            time_from = time_to - timedelta(hours=24)
+
+            results = await client.get_workload_metrics_many(
+                [deployment.get('entityId', '') for deployment in deployments],
+                time_from=time_from.strftime('%Y-%m-%dT%H:%M:%S'),
+                time_to=time_to.strftime('%Y-%m-%dT%H:%M:%S')
+            )
+
+            for deployment, (cpu_metrics, memory_metrics, _, pod_count) in zip(deployments, results):
+                print(f"{deployment.get('displayName', 'Unknown')}: {pod_count} pods, "
+                      f"max CPU {cpu_metrics['max']:.2f} millicores, "
+                      f"max memory {memory_metrics['max'] / (1024**2):.2f} MB")
+
+    asyncio.run(fetch_all())
+
+
 if __name__ == '__main__':
     print("Example 1: Basic Usage")
     print("=" * 50)
@@ -167,3 +198,7 @@ if __name__ == '__main__':
     # print("\n\nExample 4: Export to CSV")
     # print("=" * 50)
     # example_export_to_csv()
+
+    # print("\n\nExample 5: Concurrent Fetch with asyncio")
+    # print("=" * 50)
+    # example_async_fan_out()
@@ -3,9 +3,14 @@ Main script to fetch and display Kubernetes deployment metrics from Dynatrace
 """
 import argparse
 import csv
-import json
+import logging
+import traceback
 from datetime import datetime, timedelta
-from dynatrace_client import DynatraceClient
+from typing import Dict, List, NamedTuple, Optional
+import requests
+from dynatrace_client import DynatraceClient, disk_cached, encode_json
+
+DEPLOYMENTS_CACHE_TTL = 600  # seconds
 
 
 def format_memory(memory_bytes: float) -> str:
@@ -44,13 +49,84 @@ def format_cpu(cpu_millicores: float) -> str:
         return f"{cpu_millicores:.2f} millicores"
 
 
+class DeploymentResult(NamedTuple):
+    """Raw metrics of one deployment; values are formatted only when printed"""
+    deployment_name: str
+    namespace: str
+    cluster: str
+    pod_count: int
+    cpu_min: float
+    cpu_max: float
+    memory_min: float
+    memory_max: float
+    heap_min: Optional[float] = None
+    heap_max: Optional[float] = None
+
+    @property
+    def has_heap(self) -> bool:
+        return self.heap_min is not None
+
+    def to_dict(self) -> Dict:
+        """Nested dictionary with raw and formatted values, as written by the JSON output"""
+        result = {
+            'deployment_name': self.deployment_name,
+            'namespace': self.namespace,
+            'cluster': self.cluster,
+            'pod_count': self.pod_count,
+            'cpu': {
+                'min': self.cpu_min,
+                'max': self.cpu_max,
+                'min_formatted': format_cpu(self.cpu_min),
+                'max_formatted': format_cpu(self.cpu_max)
+            },
+            'memory': {
+                'min': self.memory_min,
+                'max': self.memory_max,
+                'min_formatted': format_memory(self.memory_min),
+                'max_formatted': format_memory(self.memory_max)
+            }
+        }
+
+        if self.has_heap:
+            result['heap'] = {
+                'min': self.heap_min,
+                'max': self.heap_max,
+                'min_formatted': format_memory(self.heap_min),
+                'max_formatted': format_memory(self.heap_max)
+            }
+
+        return result
+
+
+def _cached_deployments(
+    client: DynatraceClient,
+    cluster_name: str,
+    namespace: str,
+    deployment_name: str,
+    ttl: int = DEPLOYMENTS_CACHE_TTL
+) -> List[Dict]:
+    """
+    Get the deployments to report, served from a short-lived disk cache when possible
+
+    The cache is keyed by environment URL, cluster, namespace and deployment name
+    so different tenants and lookups never share entries. A ttl of 0 always
+    fetches fresh data.
+    """
+    return disk_cached(
+        'deployments', (client.base_url, cluster_name, namespace, deployment_name or ''), ttl,
+        lambda: client.get_deployments(cluster_name, namespace, name_filter=deployment_name)
+    )
+
+
 def get_deployment_metrics(
     cluster_name: str,
     namespace: str,
     hours_back: int = 24,
     output_format: str = 'table',
     output_file: str = None,
-    include_container_memory: bool = True
+    include_container_memory: bool = True,
+    deployment_name: str = 'engine',
+    cache_ttl: int = DEPLOYMENTS_CACHE_TTL
 ):
     """
     Get deployment metrics for a specific cluster and namespace
@@ -62,11 +138,13 @@ def get_deployment_metrics(
         output_format: Output format - 'table', 'json', or 'csv'
         output_file: Output file path (required for CSV format)
         include_container_memory: Include JVM heap memory metrics (default: False)
+        deployment_name: Only report the deployment with this name (default: engine)
+        cache_ttl: Seconds the deployment list is reused from the disk cache (0 disables it)
     """
     client = DynatraceClient()
 
     print(f"Fetching deployments for cluster '{cluster_name}' in namespace '{namespace}'...")
-    deployments = client.get_deployments(cluster_name, namespace)
+    deployments = _cached_deployments(client, cluster_name, namespace, deployment_name, ttl=cache_ttl)
 
     if not deployments:
         print(f"No deployments found in cluster '{cluster_name}' namespace '{namespace}'")
@@ -77,57 +155,45 @@ def get_deployment_metrics(
     # Calculate time range
     time_to = datetime.now()
     time_from = time_to - timedelta(hours=hours_back)
+    time_from_str = time_from.strftime('%Y-%m-%dT%H:%M:%S')
+    time_to_str = time_to.strftime('%Y-%m-%dT%H:%M:%S')
+
+    print(f"Fetching metrics for {len(deployments)} deployment(s)...")
+
+    # Deployments are measured concurrently over the same window; results come
+    # back in the order of the deployments
+    workload_metrics = client.get_workload_metrics_batch(
+        [deployment.get('entityId', '') for deployment in deployments],
+        time_from=time_from_str,
+        time_to=time_to_str,
+        include_container_memory=include_container_memory
+    )
 
     results = []
 
-    for deployment in deployments:
-        if 'displayName' in deployment and deployment['displayName'] != 'engine':
-            continue
-        deployment_name = deployment.get('displayName', 'Unknown')
-        entity_id = deployment.get('entityId', '')
-
-        print(f"Fetching metrics for deployment: {deployment_name}...")
-
-        cpu_metrics, memory_metrics, container_memory_metrics, pod_count = client.get_workload_metrics(
-            deployment_entity_id=entity_id,
-            time_from=time_from.strftime('%Y-%m-%dT%H:%M:%S'),
-            time_to=time_to.strftime('%Y-%m-%dT%H:%M:%S'),
-            include_container_memory=include_container_memory
+    for deployment, metrics in zip(deployments, workload_metrics):
+        cpu_metrics, memory_metrics, container_memory_metrics, pod_count = metrics
+
+        heap_metrics = container_memory_metrics if include_container_memory else None
+        result = DeploymentResult(
+            deployment_name=deployment.get('displayName', 'Unknown'),
+            namespace=namespace,
+            cluster=cluster_name,
+            pod_count=pod_count,
+            cpu_min=cpu_metrics['min'],
+            cpu_max=cpu_metrics['max'],
+            memory_min=memory_metrics['min'],
+            memory_max=memory_metrics['max'],
+            heap_min=heap_metrics['min'] if heap_metrics else None,
+            heap_max=heap_metrics['max'] if heap_metrics else None
         )
 
-        result = {
-            'deployment_name': deployment_name,
-            'namespace': namespace,
-            'cluster': cluster_name,
-            'pod_count': pod_count,
-            'cpu': {
-                'min': cpu_metrics['min'],
-                'max': cpu_metrics['max'],
-                'min_formatted': format_cpu(cpu_metrics['min']),
-                'max_formatted': format_cpu(cpu_metrics['max'])
-            },
-            'memory': {
-                'min': memory_metrics['min'],
-                'max': memory_metrics['max'],
-                'min_formatted': format_memory(memory_metrics['min']),
-                'max_formatted': format_memory(memory_metrics['max'])
-            }
-        }
-
-        if include_container_memory and container_memory_metrics:
-            result['heap'] = {
-                'min': container_memory_metrics['min'],
-                'max': container_memory_metrics['max'],
-                'min_formatted': format_memory(container_memory_metrics['min']),
-                'max_formatted': format_memory(container_memory_metrics['max'])
-            }
-
         results.append(result)
 
     # Output results
     if output_format == 'csv':
         if not output_file:
-            output_file = f"deployment_metrics_{cluster_name}_{namespace}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            output_file = f"deployment_metrics_{cluster_name}_{namespace}_{time_to.strftime('%Y%m%d_%H%M%S')}.csv"
 
         with open(output_file, 'w', newline='') as csvfile:
             fieldnames = [
@@ -147,63 +213,61 @@ def get_deployment_metrics(
 
             fieldnames.append('number_of_pods')
 
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
 
+            # One positional row per result, in fieldnames order
             for result in results:
-                row = {
-                    'cluster': result['cluster'],
-                    'deployment': result['deployment_name'],
-                    'cpu_usage_min': result['cpu']['min'],
-                    'cpu_usage_max': result['cpu']['max'],
-                    'memory_usage_min': result['memory']['min'],
-                    'memory_usage_max': result['memory']['max'],
-                    'number_of_pods': result['pod_count']
-                }
-
-                if include_container_memory and 'heap' in result:
-                    row['heap_usage_min'] = result['heap']['min']
-                    row['heap_usage_max'] = result['heap']['max']
-
+                row = [
+                    result.cluster,
+                    result.deployment_name,
+                    result.cpu_min,
+                    result.cpu_max,
+                    result.memory_min,
+                    result.memory_max
+                ]
+
+                if include_container_memory:
+                    row.extend((result.heap_min, result.heap_max) if result.has_heap else ('', ''))
+
+                row.append(result.pod_count)
                 writer.writerow(row)
 
         print(f"\nCSV file saved to: {output_file}")
 
     elif output_format == 'json':
-        print("\n" + json.dumps(results, indent=2))
+        json_results = [result.to_dict() for result in results]
+        print("\n" + encode_json(json_results, indent=True).decode('utf-8'))
     else:
         # Table output
+        columns = ['Deployment', 'Pods', 'CPU Min', 'CPU Max', 'Memory Min', 'Memory Max']
         if include_container_memory:
-            sep_line = "=" * 152
-            header = (f"{'Deployment':<30} | {'Pods':<6} | {'CPU Min':<15} | {'CPU Max':<15} | "
-                     f"{'Memory Min':<15} | {'Memory Max':<15} | {'Heap Min':<15} | {'Heap Max':<15}")
-        else:
-            sep_line = "=" * 120
-            header = f"{'Deployment':<30} | {'Pods':<6} | {'CPU Min':<15} | {'CPU Max':<15} | {'Memory Min':<15} | {'Memory Max':<15}"
+            columns += ['Heap Min', 'Heap Max']
+        # Name and pod count columns are narrower than the metric columns
+        widths = [30, 6] + [15] * (len(columns) - 2)
+        header = ' | '.join(column.ljust(width) for column, width in zip(columns, widths))
+        sep_line = "=" * (152 if include_container_memory else 120)
 
-        print("\n" + sep_line)
-        print(header)
-        print(sep_line)
+        # Collect the whole table and write it with a single print
+        lines = ['', sep_line, header, sep_line]
 
         for result in results:
-            line = (
-                f"{result['deployment_name']:<30} | "
-                f"{result['pod_count']:<6} | "
-                f"{result['cpu']['min_formatted']:<15} | "
-                f"{result['cpu']['max_formatted']:<15} | "
-                f"{result['memory']['min_formatted']:<15} | "
-                f"{result['memory']['max_formatted']:<15}"
-            )
+            cells = [
+                result.deployment_name,
+                str(result.pod_count),
+                format_cpu(result.cpu_min),
+                format_cpu(result.cpu_max),
+                format_memory(result.memory_min),
+                format_memory(result.memory_max)
+            ]
 
-            if include_container_memory and 'heap' in result:
-                line += (
-                    f" | {result['heap']['min_formatted']:<15} | "
-                    f"{result['heap']['max_formatted']:<15}"
-                )
+            if include_container_memory and result.has_heap:
+                cells += [format_memory(result.heap_min), format_memory(result.heap_max)]
 
-            print(line)
+            lines.append(' | '.join(cell.ljust(width) for cell, width in zip(cells, widths)))
 
-        print(sep_line)
+        lines.append(sep_line)
+        print('\n'.join(lines))
 
     print(f"\nMetrics collected from: {time_from.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"                    to: {time_to.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -243,24 +307,59 @@ def main():
         '-o',
         help='Output file path (for CSV format). If not specified, auto-generates filename.'
     )
+    parser.add_argument(
+        '--deployment',
+        default='engine',
+        help='Name of the deployment to report (default: engine)'
+    )
     parser.add_argument(
         '--include-heap',
         action='store_true',
         help='Include JVM heap memory metrics (for Spring Boot microservices)'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Always fetch deployments from the API instead of the {DEPLOYMENTS_CACHE_TTL}s disk cache'
+    )
+
+    parser.add_argument(
+        '--verbose',
+        '-v',
+        action='store_true',
+        help='Show debug logging from the Dynatrace client'
+    )
+    parser.add_argument(
+        '--debug',
+        action='store_true',
+        help='Print the full traceback when a Dynatrace API or configuration error stops the run'
+    )
+
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+
     try:
         get_deployment_metrics(
             cluster_name=args.cluster,
             namespace=args.namespace,
             hours_back=args.hours,
             output_format=args.format,
-            output_file=args.output
+            output_file=args.output,
+            include_container_memory=args.include_heap,
+            deployment_name=args.deployment,
+            cache_ttl=0 if args.no_cache else DEPLOYMENTS_CACHE_TTL
         )
-    except Exception as e:
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
+        # Expected failures (API errors and timeouts, missing credentials, unwritable
+        # output) are reported briefly; anything else propagates with its traceback
         print(f"Error: {e}")
+        if args.debug:
+            traceback.print_exc()
         return 1
 
     return 0
@@ -0,0 +1,401 @@
+"""
+Tests for the caching, resilience and batching helpers of the Dynatrace client
+"""
+import re
+import time
+
+import pytest
+import requests
+
+import dynatrace_client
+from dynatrace_client import (
+    METRIC_QUERY_BATCH_SIZE,
+    POD_DIMENSION,
+    DynatraceClient,
+    _MISSING,
+    _CircuitBreaker,
+    _TTLCache,
+    disk_cached,
+)
+
+
+class FakeClock:
+    """Stands in for the time module so TTLs and cooldowns can be stepped through"""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def monotonic(self) -> float:
+        return 1000.0 + self.offset
+
+    def time(self) -> float:
+        return time.time() + self.offset
+
+    def advance(self, seconds: float):
+        self.offset += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(dynatrace_client, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def client():
+    with DynatraceClient(base_url='https://env.example.com', api_token='token') as c:
+        yield c
+
+
+def _ids(selector: str):
+    """Entity IDs listed in the entityId(...) part of a selector"""
+    match = re.search(r'entityId\(([^)]*)\)', selector)
+    return re.findall(r'"([^"]+)"', match.group(1)) if match else []
+
+
+# Circuit breaker
+
+def test_breaker_opens_after_threshold_failures(clock):
+    breaker = _CircuitBreaker(threshold=3, window=30, cooldown=10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+    breaker.record_failure()
+    assert breaker.is_open()
+
+
+def test_breaker_ignores_failures_outside_window(clock):
+    breaker = _CircuitBreaker(threshold=2, window=30, cooldown=10)
+
+    breaker.record_failure()
+    clock.advance(31)
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_breaker_half_opens_after_cooldown_and_closes_on_success(clock):
+    breaker = _CircuitBreaker(threshold=2, window=30, cooldown=10)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.advance(9)
+    assert breaker.is_open()
+
+    # Cooldown over: the next call is let through as a probe
+    clock.advance(1)
+    assert not breaker.is_open()
+
+    # A successful probe forgets the failure streak
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_breaker_reopens_when_probes_keep_failing(clock):
+    breaker = _CircuitBreaker(threshold=2, window=30, cooldown=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.advance(10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open()
+
+
+def test_open_breaker_skips_the_request(client, monkeypatch):
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("request sent while the breaker is open")
+
+    monkeypatch.setattr(client._session, 'send', fail_if_called)
+    monkeypatch.setattr(client._session, 'get', fail_if_called)
+    for _ in range(dynatrace_client.BREAKER_FAILURE_THRESHOLD):
+        client._breaker.record_failure()
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client._make_request('/api/v2/entities', params={'entitySelector': 'type("HOST")'})
+
+
+# TTL cache
+
+def test_ttl_cache_expires_entries(clock):
+    cache = _TTLCache(ttl=60)
+    cache.set('key', 'value')
+
+    clock.advance(59)
+    assert cache.get('key') == 'value'
+
+    clock.advance(2)
+    assert cache.get('key') is _MISSING
+    assert cache.get('key', None) is None
+    assert 'key' not in cache
+
+
+def test_ttl_cache_counts_get_but_not_peek(clock):
+    cache = _TTLCache(ttl=60)
+    cache.set('key', 'value')
+
+    assert cache.peek('key') == 'value'
+    assert cache.peek('other', None) is None
+    assert 'key' in cache
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    assert cache.get('key') == 'value'
+    assert cache.get('other') is _MISSING
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_peek_does_not_evict_expired_entries(clock):
+    cache = _TTLCache(ttl=60)
+    cache.set('key', 'value')
+    clock.advance(61)
+
+    assert cache.peek('key') is _MISSING
+    assert len(cache) == 1
+
+    assert cache.get('key') is _MISSING
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_entry_closest_to_expiry(clock):
+    cache = _TTLCache(ttl=60, maxsize=2)
+    cache.set('old', 1)
+    clock.advance(1)
+    cache.set('new', 2)
+    cache.set('newest', 3)
+
+    assert 'old' not in cache
+    assert cache.peek('new') == 2
+    assert cache.peek('newest') == 3
+
+
+# Pagination
+
+def test_paginate_follows_page_keys_in_order(client):
+    pages = {
+        None: {'entities': [1, 2], 'nextPageKey': 'p2'},
+        'p2': {'entities': [3], 'nextPageKey': 'p3'},
+        'p3': {'entities': [4, 5]},
+    }
+    calls = []
+
+    def fake_request(endpoint, params=None):
+        calls.append(params)
+        return pages[params.get('nextPageKey')]
+
+    client._make_request = fake_request
+
+    assert list(client._paginate('/api/v2/entities', 'entities', params={'pageSize': 2})) == [1, 2, 3, 4, 5]
+    # Follow-up pages carry the page key only
+    assert calls == [{'pageSize': 2}, {'nextPageKey': 'p2'}, {'nextPageKey': 'p3'}]
+
+
+def test_paginate_raises_when_prefetched_page_fails(client):
+    def fake_request(endpoint, params=None):
+        if 'nextPageKey' in params:
+            raise requests.exceptions.ConnectionError("page lost")
+        return {'entities': [1, 2], 'nextPageKey': 'p2'}
+
+    client._make_request = fake_request
+    items = []
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for item in client._paginate('/api/v2/entities', 'entities', params={}):
+            items.append(item)
+
+    # The first page is still delivered before the failure surfaces
+    assert items == [1, 2]
+
+
+# Deployment lookup
+
+def _deployment(entity_id: str, namespace: str = 'prod') -> dict:
+    return {
+        'entityId': entity_id,
+        'displayName': entity_id.lower(),
+        'properties': {
+            'cloudApplicationDeploymentTypes': ['KUBERNETES_DEPLOYMENT'],
+            'namespaceName': namespace
+        }
+    }
+
+
+def test_get_deployments_falls_back_when_namespace_query_fails(client):
+    selectors = []
+
+    def fake_request(endpoint, params=None):
+        selectors.append(params['entitySelector'])
+        if 'isNamespaceOfCa' in params['entitySelector']:
+            raise requests.exceptions.HTTPError("400 Client Error")
+        return {'entities': [_deployment('APP-1'), _deployment('APP-2', namespace='other')]}
+
+    client._make_request = fake_request
+
+    deployments = client.get_deployments('cluster', 'prod')
+
+    assert [d['entityId'] for d in deployments] == ['APP-1']
+    assert len(selectors) == 2
+    assert selectors[1] == 'type("CLOUD_APPLICATION")'
+
+
+def test_get_deployments_falls_back_when_namespace_query_is_empty(client):
+    def fake_request(endpoint, params=None):
+        if 'isNamespaceOfCa' in params['entitySelector']:
+            return {'entities': []}
+        return {'entities': [_deployment('APP-1')]}
+
+    client._make_request = fake_request
+
+    assert [d['entityId'] for d in client.get_deployments('cluster', 'prod')] == ['APP-1']
+
+
+def test_get_deployments_raises_when_broad_listing_fails(client):
+    def fake_request(endpoint, params=None):
+        raise requests.exceptions.ConnectionError("down")
+
+    client._make_request = fake_request
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get_deployments('cluster', 'prod')
+    # Nothing is cached after a failure
+    assert len(client._deployments_cache) == 0
+
+
+# Batched workload metrics
+
+# Pods per deployment; 180 in total, so the metric query needs two batches
+POD_COUNTS = {'APP-0': 50, 'APP-1': 60, 'APP-2': 70}
+
+
+def _pod_ids(deployment_id: str):
+    return [f'CGI-{deployment_id}-{i}' for i in range(POD_COUNTS[deployment_id])]
+
+
+def _fake_workload_api(metric_batches: list):
+    """Entities and metrics API for POD_COUNTS; each pod reports its deployment number"""
+
+    def fake_request(endpoint, params=None):
+        selector = params.get('entitySelector', '')
+        if endpoint == '/api/v2/metrics/query':
+            pod_ids = _ids(selector)
+            metric_batches.append(pod_ids)
+            result = []
+            for metric_id in params['metricSelector'].split(','):
+                result.append({
+                    'metricId': metric_id,
+                    'data': [
+                        {
+                            'dimensionMap': {POD_DIMENSION: pod_id},
+                            'values': [float(pod_id.split('-')[2]) + 1]
+                        }
+                        for pod_id in pod_ids
+                    ]
+                })
+            return {'result': result}
+
+        deployment_ids = _ids(selector)
+        if selector.startswith('type("CLOUD_APPLICATION_INSTANCE")'):
+            return {'entities': [
+                {'entityId': f'CAI-{d}', 'fromRelationships': {'isInstanceOf': [{'id': d}]}}
+                for d in deployment_ids
+            ]}
+        return {'entities': [
+            {'entityId': pod_id, 'fromRelationships': {'isCgiOfCai': [{'id': f'CAI-{d}'}]}}
+            for d in deployment_ids
+            for pod_id in _pod_ids(d)
+        ]}
+
+    return fake_request
+
+
+def test_workload_metrics_batch_keeps_request_order(client):
+    metric_batches = []
+    client._make_request = _fake_workload_api(metric_batches)
+    requested = ['APP-2', 'APP-0', 'APP-1', 'APP-0']
+
+    results = client.get_workload_metrics_batch(requested, 'now-2h', 'now')
+
+    assert [pod_count for _, _, _, pod_count in results] == [70, 50, 60, 50]
+    # Every pod of APP-n reports n + 1, and max values are summed across pods
+    assert [cpu['max'] for cpu, _, _, _ in results] == [70 * 3.0, 50 * 1.0, 60 * 2.0, 50 * 1.0]
+    assert results[1] == results[3]
+
+    assert len(metric_batches) == 2
+    assert all(len(batch) <= METRIC_QUERY_BATCH_SIZE for batch in metric_batches)
+    assert sorted(pod for batch in metric_batches for pod in batch) == sorted(
+        pod for d in POD_COUNTS for pod in _pod_ids(d)
+    )
+
+
+def test_workload_metrics_batch_reuses_cached_results(client):
+    metric_batches = []
+    client._make_request = _fake_workload_api(metric_batches)
+
+    first = client.get_workload_metrics_batch(['APP-0', 'APP-1'], 'now-2h', 'now')
+    queries = len(metric_batches)
+    second = client.get_workload_metrics_batch(['APP-1', 'APP-0'], 'now-2h', 'now')
+
+    assert second == first[::-1]
+    assert len(metric_batches) == queries
+
+
+# Disk cache
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dynatrace_client, 'DISK_CACHE_DIR', tmp_path)
+    return tmp_path
+
+
+class CountingFetch:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.data
+
+
+def test_disk_cached_reuses_results_within_ttl(cache_dir, clock):
+    fetch = CountingFetch([{'entityId': 'APP-1'}])
+
+    assert disk_cached('deployments', ('https://env', 'prod'), 60, fetch) == [{'entityId': 'APP-1'}]
+    clock.advance(30)
+    assert disk_cached('deployments', ('https://env', 'prod'), 60, fetch) == [{'entityId': 'APP-1'}]
+    assert fetch.calls == 1
+
+    clock.advance(31)
+    disk_cached('deployments', ('https://env', 'prod'), 60, fetch)
+    assert fetch.calls == 2
+
+
+def test_disk_cached_keys_by_name_and_key_parts(cache_dir, clock):
+    fetch = CountingFetch(['value'])
+
+    disk_cached('deployments', ('https://env-a', 'prod'), 60, fetch)
+    disk_cached('deployments', ('https://env-b', 'prod'), 60, fetch)
+    disk_cached('deployments', ('https://env-a', 'dev'), 60, fetch)
+    disk_cached('entityTypes', ('https://env-a', 'prod'), 60, fetch)
+    # Parts are separated, so shifting text between them changes the key
+    disk_cached('deployments', ('https://env-ap', 'rod'), 60, fetch)
+
+    assert fetch.calls == 5
+    assert len(list(cache_dir.glob('*.json'))) == 5
+
+
+def test_disk_cached_skips_zero_ttl_and_empty_results(cache_dir, clock):
+    fetch = CountingFetch(['value'])
+    disk_cached('deployments', ('https://env',), 0, fetch)
+    disk_cached('deployments', ('https://env',), 0, fetch)
+    assert fetch.calls == 2
+
+    empty = CountingFetch([])
+    disk_cached('pods', ('https://env',), 60, empty)
+    disk_cached('pods', ('https://env',), 60, empty)
+    assert empty.calls == 2
+
+    assert not list(cache_dir.glob('*.json'))